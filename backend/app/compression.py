@@ -0,0 +1,92 @@
+"""Negotiated response compression.
+
+CompressionMiddleware picks brotli (when the brotli package is installed) or
+gzip from the request's Accept-Encoding, honouring q-values, and compresses
+responses of at least minimum_size bytes. It reuses Starlette's responders,
+which compress streamed bodies chunk by chunk with a flush after each one,
+so a large response is never collected and compressed as a whole, and skip
+already-encoded, partial and media responses. Large chunks are compressed
+in a worker thread to keep the event loop free.
+"""
+from typing import Dict, Optional
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+THREAD_MINIMUM_SIZE = 128 * 1024  # chunks at least this large are compressed off the event loop
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}; codings with q=0 are refused"""
+    encodings = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encodings[coding.lower()] = q
+    return encodings
+
+def negotiate(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """"br", "gzip" or None (identity); brotli wins ties since it compresses better"""
+    encodings = accepted_encodings(accept_encoding)
+    wildcard = encodings.get("*", 0.0)
+    candidates = (("br", "gzip") if brotli_available else ("gzip",))
+    scored = [(encodings.get(coding, wildcard), coding) for coding in candidates]
+    q, coding = max(scored, key=lambda item: item[0])
+    return coding if q > 0 else None
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self._compress_body, body, more_body)
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        chunk = self._compressor.process(body)
+        return chunk + (self._compressor.flush() if more_body else self._compressor.finish())
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 5, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if coding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif coding == "gzip":
+            responder = GZipResponder(
+                self.app, self.minimum_size, compresslevel=self.gzip_level, thread_minimum_size=THREAD_MINIMUM_SIZE
+            )
+        else:
+            # Still adds Vary: Accept-Encoding to responses large enough to be compressed
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
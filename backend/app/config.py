@@ -0,0 +1,73 @@
+import os
+
+# Load backend/.env when python-dotenv is installed; real environment variables win
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+if load_dotenv is not None:
+    load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+# Password hashing executor (bcrypt releases the GIL, so threads scale across cores)
+# and the one cap on hash operations running or queued; past it logins get 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", max(PASSWORD_HASH_WORKERS, 1) * 4))
+
+# Logging: root level for the app plus optional per-module overrides,
+# e.g. LOG_LEVELS="app.routers.auth=DEBUG,app.requests=WARNING"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = dict(
+    (name.strip(), level.strip().upper())
+    for name, _, level in (item.partition("=") for item in os.getenv("LOG_LEVELS", "").split(","))
+    if name.strip() and level.strip()
+)
+
+# Login admission control: token buckets per client IP and per email, and a short
+# negative cache for unknown emails (PASSWORD_HASH_MAX_PENDING caps hashing itself)
+LOGIN_IP_RATE_PER_MINUTE = float(os.getenv("LOGIN_IP_RATE_PER_MINUTE", 30))
+LOGIN_IP_BURST = float(os.getenv("LOGIN_IP_BURST", 10))
+LOGIN_EMAIL_RATE_PER_MINUTE = float(os.getenv("LOGIN_EMAIL_RATE_PER_MINUTE", 6))
+LOGIN_EMAIL_BURST = float(os.getenv("LOGIN_EMAIL_BURST", 5))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", 50000))
+UNKNOWN_EMAIL_CACHE_TTL_SECONDS = int(os.getenv("UNKNOWN_EMAIL_CACHE_TTL_SECONDS", 60))
+
+# Per-user profile snapshots; the TTL bounds staleness across worker processes
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", 10000))
+PROFILE_CACHE_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", 300))
+
+# Seeded workout-plan bodies kept by the generator's LRU plan cache
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", 10000))
+
+# Exercise catalog data file (default app/ml/data/exercises.json) and how often
+# to check it for a new version; 0 disables hot reload
+EXERCISE_CATALOG_PATH = os.getenv("EXERCISE_CATALOG_PATH")
+CATALOG_RELOAD_SECONDS = float(os.getenv("CATALOG_RELOAD_SECONDS", 30))
+
+# Response compression: bodies under the minimum go out as-is (small JSON gains
+# little and the header overhead eats into it); levels favour CPU over ratio,
+# see benchmarks/compression.py. Brotli is used when the brotli package is installed.
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 5))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 5))
+
+# Database session mode: "sync" (blocking Session on the event loop) or "async"
+# (AsyncSession; needs the async driver installed: aiosqlite for SQLite, asyncpg
+# or aiomysql for server databases). Sync stays the default while it measures
+# faster; compare with benchmarks/db_throughput.py before switching.
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+
+# Storage profile
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./fitgoalz.db")
+
+# SQLite connection pragmas (ignored for server databases)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL").upper()
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+# Connection pool sizing for server databases (PostgreSQL, MySQL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
@@ -1,26 +1,242 @@
-from sqlalchemy import create_engine
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app import config
 
-# SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./fitgoalz.db"
+# Async driver for each backend
+_ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+# Backend names SQLAlchemy no longer accepts, e.g. Heroku-style postgres:// URLs
+_BACKEND_ALIASES = {"postgres": "postgresql"}
+
+def normalize_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in _BACKEND_ALIASES:
+        driver = parsed.get_driver_name() if "+" in parsed.drivername else None
+        backend = _BACKEND_ALIASES[backend]
+        parsed = parsed.set(drivername=f"{backend}+{driver}" if driver else backend)
+    return parsed.render_as_string(hide_password=False)
+
+def to_async_url(url: str) -> str:
+    """The same database through its async driver, whatever sync driver the URL names"""
+    parsed = make_url(normalize_url(url))
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return parsed.render_as_string(hide_password=False)
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+# Database URL (DATABASE_URL in the environment or backend/.env)
+SQLALCHEMY_DATABASE_URL = normalize_url(config.DATABASE_URL)
+
+ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def engine_options(url: str) -> dict:
+    """Connection arguments for SQLite, explicit pool sizing for server databases"""
+    if is_sqlite(url):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers proceed while /log-workout writes; NORMAL sync is safe under WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
 
 #Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+if is_sqlite(SQLALCHEMY_DATABASE_URL):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 
 #Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine, only built when DB_MODE=async so the async driver stays optional in sync mode
+async_engine = None
+AsyncSessionLocal = None
+if config.DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+    if is_sqlite(ASYNC_DATABASE_URL):
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    # expire_on_commit=False: attribute access after commit must not trigger implicit IO
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 #Create Base Class
 Base = declarative_base()
 
-# Dependency
-def get_db():
-    db = SessionLocal()
+# Per-request query counter, installed by the request timing middleware
+class QueryCounter:
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+query_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = query_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+event.listen(engine, "before_cursor_execute", _count_query)
+if async_engine is not None:
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _count_query)
+
+class SyncSessionAdapter:
+    """AsyncSession-shaped wrapper over a blocking Session, used when DB_MODE=sync.
+
+    Routers are written against the awaitable AsyncSession API; in sync mode the
+    awaits complete immediately and the queries block the event loop as before.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    @property
+    def info(self) -> dict:
+        return self.sync_session.info
+
+    def get_bind(self, *args, **kwargs):
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, *args, **kwargs):
+        return self.sync_session.execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return self.sync_session.scalar(statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return self.sync_session.scalars(statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return self.sync_session.get(entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        self.sync_session.delete(instance)
+
+    async def flush(self, objects=None):
+        self.sync_session.flush(objects)
+
+    async def refresh(self, instance, attribute_names=None):
+        self.sync_session.refresh(instance, attribute_names)
+
+    async def commit(self):
+        self.sync_session.commit()
+
+    async def rollback(self):
+        self.sync_session.rollback()
+
+    async def close(self):
+        self.sync_session.close()
+
+def pool_capacity(pool) -> Optional[int]:
+    """Connections a QueuePool hands out at once (size + max overflow), or None if unbounded"""
+    size = getattr(pool, "size", None)
+    max_overflow = getattr(pool, "_max_overflow", None)
+    if not callable(size) or max_overflow is None or max_overflow < 0:
+        return None
+    return size() + max_overflow
+
+# A request keeps its connection until its background tasks (e.g. the next-plan
+# refresh) have run, and those open sessions of their own. With every pooled
+# connection held by a request waiting on its background task, nothing could
+# progress until the pool timeout; in sync mode the blocked checkout would also
+# stall the event loop. So requests first wait, without blocking, for one of
+# capacity - 1 slots, leaving a connection that background tasks always get.
+_pool_capacity = pool_capacity(async_engine.sync_engine.pool if async_engine is not None else engine.pool)
+request_session_slots = asyncio.Semaphore(max(_pool_capacity - 1, 1)) if _pool_capacity else None
+
+class RequestSlot:
+    """A request's claim on one of request_session_slots, handed back while it does no database work"""
+
+    __slots__ = ("semaphore", "held")
+
+    def __init__(self, semaphore: asyncio.Semaphore):
+        self.semaphore = semaphore
+        self.held = False
+
+    async def acquire(self):
+        if not self.held:
+            await self.semaphore.acquire()
+            self.held = True
+
+    def release(self):
+        if self.held:
+            self.semaphore.release()
+            self.held = False
+
+@asynccontextmanager
+async def session_scope():
+    """A session in the configured DB_MODE, for requests and background tasks alike"""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield SyncSessionAdapter(db)
+        finally:
+            db.close()
+
+@asynccontextmanager
+async def connection_released(db):
+    """Close db and give back its request slot around slow work that needs no database.
+
+    The session checks out a new connection when it is next used, and the slot
+    is taken again before the block exits. Without this, requests parked in
+    e.g. bcrypt would hold every slot and stall all other database endpoints.
+    """
+    await db.close()
+    slot = db.info.get("request_slot")
+    if slot is None:
+        yield
+        return
+    slot.release()
     try:
-        yield db
+        yield
     finally:
-        db.close()
\ No newline at end of file
+        await slot.acquire()
+
+# Dependency
+async def get_db():
+    async with session_scope() as db:
+        if request_session_slots is None:
+            yield db
+            return
+
+        slot = RequestSlot(request_session_slots)
+        await slot.acquire()
+        db.info["request_slot"] = slot
+        try:
+            yield db
+        finally:
+            slot.release()
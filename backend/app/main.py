@@ -1,9 +1,22 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine
-from app import models
+from app import config
+from app.compression import CompressionMiddleware
+from app.database import async_engine, engine, QueryCounter, query_counter
+from app.logging_config import setup_logging, shutdown_logging
+from app.migrations import run_migrations
+from app.ml.workout_generator import watch_catalog, workout_generator
+from app.responses import FastJSONResponse
+from app.security import password_hasher
 
-app = FastAPI(title="FitGoalz API", version="1.0.0")
+setup_logging()
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger("app.requests")
+
+app = FastAPI(title="FitGoalz API", version="1.0.0", default_response_class=FastJSONResponse)
 
 # Comprehensive CORS configuration
 app.add_middleware(
@@ -14,11 +27,62 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Negotiated gzip/brotli for larger responses; inside the timing middleware below
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=config.GZIP_LEVEL,
+    brotli_quality=config.BROTLI_QUALITY,
+)
+
+# Structured per-request timing record
+@app.middleware("http")
+async def log_request_timing(request: Request, call_next):
+    counter = QueryCounter()
+    token = query_counter.set(counter)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        query_counter.reset(token)
+        if request_logger.isEnabledFor(logging.INFO):
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", request.url.path)
+            request_logger.info(
+                "method=%s route=%s status=%d duration_ms=%.2f db_queries=%d",
+                request.method, route_path, status_code, duration_ms, counter.count,
+                extra={
+                    "method": request.method,
+                    "route": route_path,
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "db_queries": counter.count,
+                },
+            )
+
+watcher_tasks = set()
+
 # Database setup
 @app.on_event("startup")
 async def startup_event():
-    models.Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created")
+    version = run_migrations(engine)
+    logger.info("Database schema at version %d (session mode: %s)", version, "async" if async_engine is not None else "sync")
+    logger.info("Exercise catalog version %s", workout_generator.catalog.version)
+    if config.CATALOG_RELOAD_SECONDS > 0:
+        watcher_tasks.add(asyncio.create_task(watch_catalog(workout_generator, config.CATALOG_RELOAD_SECONDS)))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in watcher_tasks:
+        task.cancel()
+    password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+    shutdown_logging()
 
 def load_router(router_name):
     """Helper function to load routers with error handling"""
@@ -36,16 +100,14 @@ def load_router(router_name):
             from app.routers import profile
             app.include_router(profile.router, prefix="/api")
         
-        print(f"✅ {router_name} router loaded successfully")
+        logger.info("%s router loaded successfully", router_name)
         return True
-    except Exception as e:
-        print(f"❌ Failed to load {router_name} router: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Failed to load %s router", router_name)
         return False
 
 # Load all routers in order
-print("🔍 Loading routers...")
+logger.debug("Loading routers...")
 routers = ["auth", "workouts", "feedback", "profile"]
 
 for router in routers:
@@ -61,7 +123,9 @@ async def health_check():
 
 @app.on_event("startup")
 async def debug_routes():
-    print("🔍 DEBUG: Registered routes:")
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug("Registered routes:")
     for route in app.routes:
         if hasattr(route, 'path') and hasattr(route, 'methods'):
-            print(f"  {route.methods} {route.path}")
\ No newline at end of file
+            logger.debug("  %s %s", sorted(route.methods), route.path)
@@ -0,0 +1,109 @@
+import logging
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import Session
+from app import models
+from app.stats import rebuild_stats
+
+logger = logging.getLogger(__name__)
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, description: str):
+    """Register a schema migration; versions are applied in ascending order, once each"""
+    def register(func: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return register
+
+_version_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def _create_index(conn: Connection, table, name: str):
+    index = next(index for index in table.indexes if index.name == name)
+    # Expression indexes are not reflected on every backend, so checkfirst cannot see them
+    if any(not isinstance(expression, Column) for expression in index.expressions):
+        conn.execute(CreateIndex(index, if_not_exists=True))
+    else:
+        index.create(bind=conn, checkfirst=True)
+
+def _add_column(conn: Connection, table, name: str):
+    if name in {column["name"] for column in inspect(conn).get_columns(table.name)}:
+        return
+    column = table.c[name]
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(dialect=conn.dialect)}"
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+    conn.execute(text(ddl))
+
+# ========== MIGRATIONS ==========
+# Steps must be idempotent: the baseline creates every table from the current
+# models, so later steps may find their objects already present on fresh databases.
+
+@migration(1, "baseline schema")
+def _baseline(conn: Connection):
+    models.Base.metadata.create_all(bind=conn)
+
+@migration(2, "workout_feedback (user_id, created_at DESC) index for history reads")
+def _workout_feedback_user_created(conn: Connection):
+    _create_index(conn, models.WorkoutFeedback.__table__, "ix_workout_feedback_user_created")
+
+@migration(3, "user_workout_stats rollup, backfilled from workout_feedback")
+def _user_workout_stats(conn: Connection):
+    models.UserWorkoutStats.__table__.create(bind=conn, checkfirst=True)
+    with Session(bind=conn) as session:
+        rebuild_stats(session)
+
+@migration(4, "user_next_plans for precomputed workout plans")
+def _user_next_plans(conn: Connection):
+    models.UserNextPlan.__table__.create(bind=conn, checkfirst=True)
+
+@migration(5, "user_workout_stats.recent_exercises ring, backfilled from workout_feedback")
+def _recent_exercises(conn: Connection):
+    _add_column(conn, models.UserWorkoutStats.__table__, "recent_exercises")
+    with Session(bind=conn) as session:
+        rebuild_stats(session)
+
+@migration(6, "users.data_version for conditional GETs")
+def _user_data_version(conn: Connection):
+    _add_column(conn, models.User.__table__, "data_version")
+
+@migration(7, "users lower(email) index for case-insensitive logins")
+def _user_email_lower(conn: Connection):
+    _create_index(conn, models.User.__table__, "ix_users_email_lower")
+
+# ========== RUNNER ==========
+
+def run_migrations(engine: Engine) -> int:
+    """Apply pending migrations, each in its own transaction; returns the schema version"""
+    with engine.begin() as conn:
+        schema_migrations.create(bind=conn, checkfirst=True)
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    version = max(applied, default=0)
+    for step in sorted(MIGRATIONS, key=lambda m: m.version):
+        if step.version in applied:
+            continue
+        with engine.begin() as conn:
+            step.apply(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=step.version, description=step.description, applied_at=datetime.utcnow()
+            ))
+        version = step.version
+        logger.info("Applied migration %d: %s", step.version, step.description)
+    return version
@@ -0,0 +1,264 @@
+"""Exercise catalog for the workout generator.
+
+The exercises and the (fitness_level, goal) library live in a versioned JSON
+data file (app/ml/data/exercises.json by default). Each exercise is defined
+once, with its rep scheme and training attributes worked out up front. The
+catalog numbers the exercises and indexes them by bucket and by attribute when
+it is loaded, so plan generation does dict lookups instead of scanning
+exercise names per request. CatalogFile notices when the data file changes so
+a new catalog can be swapped in without a restart.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Sequence, Tuple
+import numpy as np
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "exercises.json")
+
+REPS = "8-12"
+TIMED = "30-60 seconds"
+
+# Attributes that get a (attribute, value) -> exercise ids index
+INDEXED_ATTRIBUTES = ("rep_scheme", "modality", "impact", "equipment", "muscle_groups", "contraindications")
+
+# ========== CONSTRAINT BITS ==========
+# Equipment an exercise needs and injuries it aggravates share one bit space, so
+# an exercise fits a profile when (exercise.mask & profile blocked mask) == 0.
+
+EQUIPMENT = ("bar", "pullup_bar", "bench", "wall", "box", "jump_rope", "dumbbells")
+INJURIES = ("knee", "ankle", "wrist", "shoulder", "lower_back")
+EQUIPMENT_BITS = {item: 1 << i for i, item in enumerate(EQUIPMENT)}
+INJURY_BITS = {item: 1 << (len(EQUIPMENT) + i) for i, item in enumerate(INJURIES)}
+ALL_EQUIPMENT = sum(EQUIPMENT_BITS.values())
+ALL_INJURIES = sum(INJURY_BITS.values())
+
+# Kit each profile equipment choice provides; unknown or unset choices restrict nothing
+EQUIPMENT_PROFILES = {
+    "home": ("wall",),
+    "bodyweight": ("wall",),
+    "basic": ("wall", "bench", "box", "jump_rope", "dumbbells"),
+    "gym": EQUIPMENT,
+    "mixed": EQUIPMENT,
+}
+
+# Words in the free-text injuries field that mark each injury. They are matched
+# as whole words (stems end in \w*), so "discomfort" is no disc and "feedback" no
+# back; everyday words ("back", "hand", "feet") also need a qualifier, since "I'm
+# back after a break" or "on the other hand" say nothing about an injury.
+_SIDE = r"(?:left|right|lower|upper|bad|sore|stiff|hurt|injured|broken|my)\s+"
+INJURY_KEYWORDS = {
+    "knee": (r"knees?", "acl", "mcl", r"menisc\w*", r"patell\w*"),
+    "ankle": (r"ankles?", "achilles", r"plantar", r"shins?", _SIDE + r"(?:foot|feet)"),
+    "wrist": (r"wrists?", r"carpal", _SIDE + r"hands?"),
+    "shoulder": (r"shoulders?", r"rotator", r"elbows?"),
+    "lower_back": (
+        _SIDE + "back",
+        r"back\s+(?:pain|injury|injuries|problems?|issues?|surgery|spasms?)",
+        r"backache", "spine", "spinal", r"discs?", r"herniat\w*", "sciatica", "lumbar",
+    ),
+}
+INJURY_PATTERNS = {
+    injury: re.compile(r"\b(?:" + "|".join(keywords) + r")\b") for injury, keywords in INJURY_KEYWORDS.items()
+}
+
+# Constraints can leave a bucket too small for a varied plan (a home profile with
+# a bad knee and a sore wrist kept only Glute Bridges). Below this many, the pool
+# is widened, relaxing the least important constraint first: the goal, then the
+# equipment, and only then the injuries, taking exercises with the fewest conflicts
+MIN_CANDIDATES = 4  # the shortest session's exercise count
+
+# High-impact moves are contraindicated for these on top of their own list
+HIGH_IMPACT_CONTRAINDICATIONS = ("knee", "ankle")
+
+@dataclass(frozen=True, slots=True)
+class Exercise:
+    """One catalog entry; id is its position in ExerciseCatalog.exercises"""
+    id: int
+    name: str
+    rep_scheme: str
+    modality: str  # strength, cardio
+    impact: str  # low, high
+    equipment: str  # none, or the one piece of kit it needs
+    muscle_groups: Tuple[str, ...]
+    contraindications: Tuple[str, ...]
+    mask: int  # EQUIPMENT_BITS it needs | INJURY_BITS it aggravates
+
+class ExerciseCatalog:
+    """Immutable set of exercises with prebuilt bucket and attribute indexes"""
+
+    def __init__(self, exercises: Sequence[Exercise], buckets: Mapping[Tuple[str, str], Sequence[int]],
+                 version: str = "builtin"):
+        self.version = version
+        self.exercises: Tuple[Exercise, ...] = tuple(exercises)
+        self._ids_by_name = {exercise.name: exercise.id for exercise in self.exercises}
+        self._buckets = {key: tuple(self.exercises[i] for i in ids) for key, ids in buckets.items()}
+        self._bucket_masks = {
+            key: np.array([exercise.mask for exercise in bucket], dtype=np.int64)
+            for key, bucket in self._buckets.items()
+        }
+        # (level, goal, blocked) -> filtered bucket; bounded by buckets x distinct constraint masks
+        self._candidates: Dict[Tuple[str, str, int], Tuple[Exercise, ...]] = {}
+        # Every exercise in a fitness level's buckets, in library order, for widening small pools
+        level_pools: Dict[str, Dict[int, Exercise]] = {}
+        for (level, _), bucket in self._buckets.items():
+            level_pools.setdefault(level, {}).update((exercise.id, exercise) for exercise in bucket)
+        self._level_pools = {level: tuple(pool.values()) for level, pool in level_pools.items()}
+
+        by_attribute: Dict[Tuple[str, str], set] = {}
+        for exercise in self.exercises:
+            for attribute in INDEXED_ATTRIBUTES:
+                value = getattr(exercise, attribute)
+                for item in (value if isinstance(value, tuple) else (value,)):
+                    by_attribute.setdefault((attribute, item), set()).add(exercise.id)
+        self._by_attribute = {key: frozenset(ids) for key, ids in by_attribute.items()}
+
+    @classmethod
+    def from_definitions(cls, exercises: Mapping[str, Mapping[str, Any]], library: Mapping[str, Mapping[str, Iterable[str]]],
+                         version: str = "builtin") -> "ExerciseCatalog":
+        """Build from the data file's "exercises" and "library" sections; names and attribute values are interned"""
+        records = []
+        for exercise_id, (name, definition) in enumerate(exercises.items()):
+            try:
+                rep_scheme, modality, impact, equipment = (
+                    definition["rep_scheme"], definition["modality"], definition["impact"], definition["equipment"]
+                )
+            except KeyError as exc:
+                raise ValueError(f"Exercise {name!r} is missing {exc.args[0]!r}") from exc
+            muscle_groups = definition.get("muscle_groups", ())
+            contraindications = tuple(definition.get("contraindications", ()))
+            if impact == "high":
+                contraindications = tuple(dict.fromkeys((*contraindications, *HIGH_IMPACT_CONTRAINDICATIONS)))
+            try:
+                mask = EQUIPMENT_BITS[equipment] if equipment != "none" else 0
+                for injury in contraindications:
+                    mask |= INJURY_BITS[injury]
+            except KeyError as exc:
+                raise ValueError(f"Exercise {name!r} has unknown equipment or injury {exc.args[0]!r}") from exc
+            records.append(Exercise(
+                id=exercise_id,
+                name=sys.intern(name.strip()),
+                rep_scheme=sys.intern(rep_scheme),
+                modality=sys.intern(modality),
+                impact=sys.intern(impact),
+                equipment=sys.intern(equipment),
+                muscle_groups=tuple(sys.intern(group) for group in muscle_groups),
+                contraindications=tuple(sys.intern(injury) for injury in contraindications),
+                mask=mask,
+            ))
+        ids_by_name = {record.name: record.id for record in records}
+
+        buckets = {}
+        for level, goals in library.items():
+            for goal, names in goals.items():
+                try:
+                    buckets[(level, goal)] = [ids_by_name[name.strip()] for name in names]
+                except KeyError as exc:
+                    raise ValueError(f"Library bucket {level}/{goal} names unknown exercise {exc.args[0]!r}") from exc
+        return cls(records, buckets, version)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "ExerciseCatalog":
+        """Parse a data file; its "version" names the catalog, else a hash of the content does"""
+        data = json.loads(raw)
+        version = str(data.get("version") or hashlib.sha256(raw).hexdigest()[:12])
+        return cls.from_definitions(data["exercises"], data["library"], version)
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def __getitem__(self, exercise_id: int) -> Exercise:
+        return self.exercises[exercise_id]
+
+    def get(self, name: str) -> Optional[Exercise]:
+        exercise_id = self._ids_by_name.get(name)
+        return None if exercise_id is None else self.exercises[exercise_id]
+
+    def bucket(self, fitness_level: str, goal: str) -> Tuple[Exercise, ...]:
+        """Exercises for a (fitness_level, goal) pair in library order; empty if unknown"""
+        return self._buckets.get((fitness_level, goal), ())
+
+    def candidates(self, fitness_level: str, goal: str, blocked: int = 0) -> Tuple[Exercise, ...]:
+        """The bucket's exercises whose mask shares no bit with `blocked` (see compile_constraints),
+        widened when fewer than MIN_CANDIDATES remain"""
+        bucket = self.bucket(fitness_level, goal)
+        if not blocked or not bucket:
+            return bucket
+        key = (fitness_level, goal, blocked)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            allowed = np.flatnonzero((self._bucket_masks[(fitness_level, goal)] & blocked) == 0)
+            candidates = tuple(bucket[i] for i in allowed.tolist())
+            if len(candidates) < MIN_CANDIDATES:
+                candidates = self._widen(candidates, fitness_level, blocked)
+            self._candidates[key] = candidates
+        return candidates
+
+    def _widen(self, candidates: Tuple[Exercise, ...], fitness_level: str, blocked: int) -> Tuple[Exercise, ...]:
+        """Top a too-small pool up to MIN_CANDIDATES, relaxing constraints in order of importance"""
+        pool = dict.fromkeys(candidates)
+        injuries = blocked & ALL_INJURIES
+        level_pool = self._level_pools.get(fitness_level, ())
+        # Other goals at the same level, then any level; then the same without equipment limits
+        for exercises, mask in ((level_pool, blocked), (self.exercises, blocked),
+                                (level_pool, injuries), (self.exercises, injuries)):
+            pool.update((exercise, None) for exercise in exercises if not exercise.mask & mask)
+            if len(pool) >= MIN_CANDIDATES:
+                return tuple(pool)
+        # Last resort: the exercises aggravating the fewest of the user's injuries, low impact first
+        ranked = sorted(
+            (exercise for exercise in self.exercises if exercise not in pool),
+            key=lambda exercise: (bin(exercise.mask & injuries).count("1"), exercise.impact != "low", exercise.id),
+        )
+        pool.update((exercise, None) for exercise in ranked[:MIN_CANDIDATES - len(pool)])
+        return tuple(pool)
+
+    def with_attribute(self, attribute: str, value: str) -> FrozenSet[int]:
+        """Ids of exercises whose attribute equals (or, for muscle_groups, contains) value"""
+        return self._by_attribute.get((attribute, value), frozenset())
+
+@lru_cache(maxsize=4096)
+def compile_constraints(equipment: Optional[str], injuries: Optional[str]) -> int:
+    """A profile's equipment choice and free-text injuries as a mask of blocked bits"""
+    available = EQUIPMENT_PROFILES.get((equipment or "").strip().lower(), EQUIPMENT)
+    blocked = ALL_EQUIPMENT & ~sum(EQUIPMENT_BITS[item] for item in available)
+    text = (injuries or "").lower()
+    for injury, pattern in INJURY_PATTERNS.items():
+        if pattern.search(text):
+            blocked |= INJURY_BITS[injury]
+    return blocked
+
+def load_catalog(path: str = DEFAULT_CATALOG_PATH) -> ExerciseCatalog:
+    with open(path, "rb") as data_file:
+        return ExerciseCatalog.from_bytes(data_file.read())
+
+class CatalogFile:
+    """Tracks one catalog data file and reloads it when its size or mtime changes"""
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH):
+        self.path = path
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> ExerciseCatalog:
+        signature = self._stat()
+        catalog = load_catalog(self.path)
+        self._signature = signature
+        return catalog
+
+    def load_if_changed(self) -> Optional[ExerciseCatalog]:
+        """The freshly parsed catalog if the file changed since the last load, else None.
+
+        Raises (and keeps the old signature, so the next poll retries) if the
+        new content does not parse.
+        """
+        if self._stat() == self._signature:
+            return None
+        return self.load()
@@ -0,0 +1,97 @@
+"""Periodized multi-week programs, built lazily one week at a time.
+
+A program runs in four-week blocks: three build weeks that raise the rep or
+time targets, then a deload week at reduced volume. Each block deals a fresh
+shuffle of the candidate exercises across the week's sessions and keeps them
+for the whole block, so the overload applies to the same movements. Sets go
+up by one per block, to a cap.
+
+Every week is a pure function of the program's inputs and its number, so a
+WorkoutProgram stores no weeks: reading week 9 builds only week 9.
+"""
+import random
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+from app.ml.catalog import REPS, TIMED, Exercise
+
+BLOCK_WEEKS = 4  # three build weeks, then a deload week
+BASE_SETS = 3
+MAX_SETS = 5
+DELOAD_SETS = 2
+
+# Targets for build weeks 1-3 of a block, by rep scheme; deload weeks reuse the first
+REP_PROGRESSIONS = {
+    REPS: ("8-10", "10-12", "12-15"),
+    TIMED: ("30 seconds", "45 seconds", "60 seconds"),
+}
+BUILD_REST = "30-60 seconds"
+DELOAD_REST = "60-90 seconds"
+
+class WorkoutProgram:
+    """A multi-week program over a fixed candidate pool; weeks are built on demand"""
+
+    def __init__(self, header: Dict, candidates: Sequence[Exercise], exercises_per_session: int,
+                 days_per_week: int, weeks: int, seed: Hashable):
+        self.header = header
+        self.candidates = tuple(candidates)
+        self.exercises_per_session = min(exercises_per_session, len(self.candidates))
+        self.days_per_week = max(days_per_week, 1)
+        self.weeks = weeks
+        self.seed = seed
+
+    def __len__(self) -> int:
+        return self.weeks
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_weeks()
+
+    def iter_weeks(self, start: int = 1, count: Optional[int] = None) -> Iterator[Dict]:
+        """Yield weeks start, start + 1, ... (1-based), building each only when it is reached"""
+        stop = self.weeks + 1 if count is None else min(self.weeks + 1, start + count)
+        for number in range(max(start, 1), stop):
+            yield self.week(number)
+
+    def week(self, number: int) -> Dict:
+        """Build week `number` (1-based)"""
+        if not 1 <= number <= self.weeks:
+            raise IndexError(f"Week {number} is outside this {self.weeks}-week program")
+
+        block, position = divmod(number - 1, BLOCK_WEEKS)
+        deload = position == BLOCK_WEEKS - 1
+        if deload:
+            sets, step, rest = DELOAD_SETS, 0, DELOAD_REST
+        else:
+            sets, step, rest = min(BASE_SETS + block, MAX_SETS), position, BUILD_REST
+
+        sessions = []
+        for day, exercises in enumerate(self._block_sessions(block), start=1):
+            sessions.append({
+                "day": day,
+                "exercises": [exercise.name for exercise in exercises],
+                "workout_structure": [
+                    {
+                        "exercise": exercise.name,
+                        "sets": sets,
+                        "reps": REP_PROGRESSIONS.get(exercise.rep_scheme, (exercise.rep_scheme,) * 3)[step],
+                        "rest": rest,
+                    }
+                    for exercise in exercises
+                ],
+            })
+        return {
+            "week": number,
+            "block": block + 1,
+            "phase": "deload" if deload else "build",
+            "sessions": sessions,
+        }
+
+    def _block_sessions(self, block: int) -> List[Tuple[Exercise, ...]]:
+        """Deal one shuffle of the pool round-robin across the week's sessions"""
+        pool = list(self.candidates)
+        random.Random(repr((self.seed, block))).shuffle(pool)
+        per_session = self.exercises_per_session
+        if not pool or not per_session:
+            return [() for _ in range(self.days_per_week)]
+        return [
+            tuple(pool[(day * per_session + i) % len(pool)] for i in range(per_session))
+            for day in range(self.days_per_week)
+        ]
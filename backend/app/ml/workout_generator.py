@@ -1,89 +1,109 @@
+import asyncio
+import gc
+import heapq
+import logging
 import random
-from typing import Dict, List
+from datetime import date, datetime
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from app import config
+from app.cache import LRUCache
+from app.ml.catalog import DEFAULT_CATALOG_PATH, CatalogFile, Exercise, ExerciseCatalog, compile_constraints
+from app.ml.program import WorkoutProgram
 
-class WorkoutGenerator:
-    def __init__(self):
-        self.exercise_library = self._load_exercise_library()
+# BMI category boundaries: below 18.5 underweight, 18.5-25 normal, 25-30 overweight
+BMI_THRESHOLDS = (18.5, 25, 30)
+BMI_CATEGORIES = ("underweight", "normal", "overweight", "obese")
 
-    def _load_exercise_library(self):
-        return {
-            'beginner': {
-                'weight_loss': [
-                    "Bodyweight Squats", "Walking Lunges", "Knee Push-ups", "Plank", 
-                    "Jumping Jacks", "High Knees", "Mountain Climbers", "Glute Bridges"
-                ],
-                'muscle_gain': [
-                    "Push-ups", "Bodyweight Rows", "Squats", "Lunges",
-                    "Plank Shoulder Taps", "Glute Bridges", " Assisted Pullups", "Side Planks"
-                ],
-                'endurance': [
-                    "Jumping Jacks", "High Knees", "Butt Kicks", "Mountain Climbers",
-                    "Plank Twists", "Bodyweight Squats", "Walking Lunges", "Arm Circles"
-                ]
-            },
-            'intermediate': {
-                'weight_loss': [
-                    "Burpees", "Jump Squats", "Push-ups", "Plank Jacks",
-                    "Mountain Climbers", "High Knees", "Russian Twists", "Leg Raises"
-                ],
-                'muscle_gain': [
-                    "Diamond Push-ups", "Pike Push-ups", "Bulgarian Split Squats", 
-                    "Reverse Lunges", "One Leg Planks", "Superman", "Side Plank Dips"
-                ],
-                'endurance': [
-                    "Burpees", "Jumping Lunges", "Mountain Climbers", "High Knees",
-                    "Plank Up-Downs", "Russian Twists", "Flutter Kicks", "Jump Rope (imaginary)"
-                ]
-            },
-            'advanced': {
-                'weight_loss': [
-                    "Clap Push-ups", "Jump Lunges", "Burpee Tuck Jumps", "Plank to Push-up",
-                    "Mountain Climber Crossovers", "Russian Twist Jumps", "Leg Raise Crossovers"
-                ],
-                'muscle_gain': [
-                    "One-arm Push-ups", "Pistol Squats", "Handstand Push-ups", "Archer Push-ups",
-                    "Dragon Flags", "L-sit", "Planche Progressions"
-                ],
-                'endurance': [
-                    "Burpee Box Jumps", "Double Unders (jump rope)", "Man Makers",
-                    "Bear Crawls", "Spiderman Push-ups", "V-ups", "Hollow Body Rocks"
-                ]
-            }
-        }
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROGRAM_WEEKS = 12
+
+# Sessions up to 20 minutes get 4 exercises, up to 40 get 6, longer ones 8
+DURATION_LIMITS = (20, 40)
+EXERCISE_COUNTS = (4, 6, 8)
+
+# Relative chance of drawing an exercise from the user's recent sessions; fresh ones weigh 1
+RECENT_EXERCISE_WEIGHT = 0.25
+
+def plan_seed(user_id: int, day: date) -> Tuple[int, int, int]:
+    """Seed for a user's plan: one plan per user per ISO week"""
+    year, week, _ = day.isocalendar()
+    return (user_id, year, week)
+
+def program_seed(user_id: int, started: Optional[datetime]) -> Tuple[int, str]:
+    """Seed for a user's multi-week program: fixed at the program's start, so every
+    week is drawn from the same program however long the user takes to reach it"""
+    return (user_id, started.isoformat() if started else "")
+
+def program_week(started: Optional[datetime], today: date) -> int:
+    """1-based week of a program that began on `started` (week 1 when unknown)"""
+    if started is None:
+        return 1
+    return max((today - started.date()).days // 7, 0) + 1
+
+class WorkoutGenerator:
+    def __init__(self, plan_cache_size: int = config.PLAN_CACHE_SIZE,
+                 catalog_path: str = config.EXERCISE_CATALOG_PATH or DEFAULT_CATALOG_PATH):
+        self.catalog_file = CatalogFile(catalog_path)
+        self.catalog = self.catalog_file.load()
+        # Seeded plan bodies; keys hold every input that affects them, so profile
+        # edits simply miss and the stale entries age out
+        self.plan_cache = LRUCache(maxsize=plan_cache_size)
 
     def calculate_bmi(self, weight: float, height: float) -> float:
         """Calculate BMI from weight (kg) and height (m)"""
         height_m = height / 100  # Convert cm to meters
         return weight / (height_m ** 2)
     
-    def generate_workout_plan(self, user_profile: Dict) -> Dict:
-        """Generate personalized workout plan based on user profile"""
+    def generate_workout_plan(self, user_profile: Dict, seed: Optional[Hashable] = None,
+                              recent_exercises: Iterable[str] = ()) -> Dict:
+        """Generate personalized workout plan based on user profile.
+
+        With a seed, e.g. plan_seed(user_id, day), the same inputs always give the
+        same plan and its body is kept in plan_cache; without one the exercises are
+        drawn from the global random module on every call. Exercises named in
+        recent_exercises (the user's last sessions) are drawn with
+        RECENT_EXERCISE_WEIGHT, so they only come back when little else fits.
+        """
         
         # Calculate BMI for additional insights
         bmi = self.calculate_bmi(user_profile['weight'], user_profile['height'])
+        bmi_category = self._analyze_bmi(bmi)
 
         # Adjust intensity based on BMI and fitness level
         fitness_level = user_profile['fitness_level']
         goal = user_profile['goals']
         workout_days = user_profile.get('workout_days', 3)
         duration = user_profile.get('workout_duration', 30)
-        
-        # Select exercises based on fitness level and goals
-        available_exercises = self.exercise_library.get(fitness_level, {}).get(goal, [])
 
         # Adjust number of exercises based on duration
-        if duration <= 20:
-            num_exercises = 4
-        elif duration <= 40:
-            num_exercises = 6
-        else:
-            num_exercises = 8
-        
-        # Select random exercises
-        selected_exercises = random.sample(
-            available_exercises, 
-            min(num_exercises, len(available_exercises))
-        )
+        num_exercises = self._exercise_count(duration)
+
+        # Equipment and injuries rule exercises out of the level/goal bucket
+        blocked = compile_constraints(user_profile.get('equipment'), user_profile.get('injuries'))
+
+        # Everything below the header depends only on these inputs
+        catalog = self.catalog
+        available_exercises = catalog.candidates(fitness_level, goal, blocked)
+        recent = self._recent_ids(catalog, available_exercises, recent_exercises)
+        key = (catalog.version, fitness_level, goal, num_exercises, bmi_category, blocked, recent, seed)
+        body = self.plan_cache.get(key) if seed is not None else None
+        if body is None:
+            rng = random.Random(repr(seed)) if seed is not None else random
+            selected_exercises = self._sample(
+                rng, available_exercises,
+                min(num_exercises, len(available_exercises)),
+                recent
+            )
+            body = (
+                tuple(exercise.name for exercise in selected_exercises),
+                tuple(self._generate_workout_structure(selected_exercises, duration)),
+                tuple(self._recommendations_for(bmi_category, goal, fitness_level)),
+            )
+            if seed is not None:
+                self.plan_cache.set(key, body)
+        exercises, structure, recommendations = body
 
         # Generate workout plan
         workout_plan = {
@@ -92,66 +112,214 @@ class WorkoutGenerator:
             "goal": goal,
             "duration": duration,
             "days_per_week": workout_days,
-            "bmi_analysis": self._analyze_bmi(bmi),
-            "exercises": selected_exercises,
-            "workout_structure": self._generate_workout_structure(selected_exercises, duration),
-            "recommendations": self._generate_recommendations(user_profile, bmi)
+            "bmi_analysis": bmi_category,
+            "exercises": list(exercises),
+            "workout_structure": [dict(entry) for entry in structure],
+            "recommendations": list(recommendations)
         }
         return workout_plan
+
+    def generate_program(self, user_profile: Dict, weeks: int = DEFAULT_PROGRAM_WEEKS,
+                         seed: Optional[Hashable] = None) -> WorkoutProgram:
+        """A periodized program of `weeks` weeks with workout_days sessions each.
+
+        Nothing is built up front: weeks are materialized as they are read. Pass
+        the same seed to get the same weeks on every read.
+        """
+        fitness_level = user_profile['fitness_level']
+        goal = user_profile['goals']
+        workout_days = user_profile.get('workout_days') or 3
+        duration = user_profile.get('workout_duration', 30)
+        blocked = compile_constraints(user_profile.get('equipment'), user_profile.get('injuries'))
+        header = {
+            "plan_name": f"{weeks}-Week {goal.replace('_', ' ').title()} Program",
+            "fitness_level": fitness_level,
+            "goal": goal,
+            "duration": duration,
+            "days_per_week": workout_days,
+            "weeks": weeks,
+        }
+        return WorkoutProgram(
+            header,
+            self.catalog.candidates(fitness_level, goal, blocked),
+            self._exercise_count(duration),
+            workout_days,
+            weeks,
+            seed if seed is not None else random.getrandbits(64),
+        )
+
+    def set_catalog(self, catalog: ExerciseCatalog):
+        """Switch to a new catalog; cached plans built from the old one are dropped.
+
+        The swap is one attribute assignment: requests already running keep the
+        catalog they started with, later ones see only the new one.
+        """
+        self.catalog = catalog
+        self.plan_cache.clear()
+
+    def reload_catalog(self) -> bool:
+        """Swap in the catalog file's content if it changed to a new version; returns whether it did"""
+        catalog = self.catalog_file.load_if_changed()
+        if catalog is None or catalog.version == self.catalog.version:
+            return False
+        self.set_catalog(catalog)
+        logger.info("Exercise catalog reloaded: version %s, %d exercises", catalog.version, len(catalog))
+        return True
     
+    def generate_workout_plans(self, profiles: Sequence[Dict], rng: Optional[np.random.Generator] = None) -> List[Dict]:
+        """Generate plans for many profiles at once, in input order.
+
+        BMI, BMI category and exercise count are computed over arrays; profiles are
+        then grouped by (fitness_level, goal, duration bucket, constraint mask) so each group shares its
+        plan header, structure entries and recommendation lists and draws all of
+        its exercise samples in one call. Those nested entries and lists are shared
+        between plans of a batch, so treat the plans as read-only (e.g. serialize them).
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        count = len(profiles)
+        if count == 0:
+            return []
+
+        weights = np.fromiter((p['weight'] for p in profiles), dtype=float, count=count)
+        heights = np.fromiter((p['height'] for p in profiles), dtype=float, count=count)
+        durations = np.fromiter((p.get('workout_duration', 30) for p in profiles), dtype=float, count=count)
+        bmi_codes = np.digitize(weights / (heights / 100) ** 2, BMI_THRESHOLDS).tolist()
+        duration_codes = np.digitize(durations, DURATION_LIMITS, right=True)
+
+        blocked = np.fromiter(
+            (compile_constraints(p.get('equipment'), p.get('injuries')) for p in profiles), dtype=np.int64, count=count
+        )
+
+        # One integer key per (fitness_level, goal, duration bucket, constraint mask)
+        levels, level_codes = np.unique([p['fitness_level'] for p in profiles], return_inverse=True)
+        goals, goal_codes = np.unique([p['goals'] for p in profiles], return_inverse=True)
+        masks, mask_codes = np.unique(blocked, return_inverse=True)
+        group_keys = (level_codes * len(goals) + goal_codes) * len(EXERCISE_COUNTS) + duration_codes
+        group_keys = group_keys * len(masks) + mask_codes
+        order = np.argsort(group_keys, kind="stable")
+        group_starts = np.flatnonzero(np.diff(group_keys[order])) + 1
+
+        catalog = self.catalog
+        plans: List[Optional[Dict]] = [None] * count
+        # Millions of acyclic dicts would otherwise trigger repeated full collections
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for members in np.split(order, group_starts):
+                first = members[0]
+                fitness_level = str(levels[level_codes[first]])
+                goal = str(goals[goal_codes[first]])
+                available_exercises = catalog.candidates(fitness_level, goal, int(masks[mask_codes[first]]))
+                names = [exercise.name for exercise in available_exercises]
+                structure = [self._structure_entry(exercise) for exercise in available_exercises]
+                recommendations = [
+                    self._recommendations_for(category, goal, fitness_level) for category in BMI_CATEGORIES
+                ]
+
+                # Rows of a random permutation per profile; the first k columns are a sample without replacement
+                num_exercises = min(EXERCISE_COUNTS[duration_codes[first]], len(available_exercises))
+                picks = rng.random((len(members), len(available_exercises))).argsort(axis=1)[:, :num_exercises]
+
+                plan_name = f"Personalized {goal.replace('_', ' ').title()} Plan"
+                for index, picked in zip(members.tolist(), picks.tolist()):
+                    profile = profiles[index]
+                    bmi_code = bmi_codes[index]
+                    plans[index] = {
+                        "plan_name": plan_name,
+                        "fitness_level": fitness_level,
+                        "goal": goal,
+                        "duration": profile.get('workout_duration', 30),
+                        "days_per_week": profile.get('workout_days', 3),
+                        "bmi_analysis": BMI_CATEGORIES[bmi_code],
+                        "exercises": [names[i] for i in picked],
+                        "workout_structure": [structure[i] for i in picked],
+                        "recommendations": recommendations[bmi_code],
+                    }
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        return plans
+
+    def _exercise_count(self, duration: int) -> int:
+        """Number of exercises for a session of `duration` minutes"""
+        for limit, num_exercises in zip(DURATION_LIMITS, EXERCISE_COUNTS):
+            if duration <= limit:
+                return num_exercises
+        return EXERCISE_COUNTS[-1]
+
+    def _recent_ids(self, catalog: ExerciseCatalog, candidates: Sequence[Exercise],
+                    recent_exercises: Iterable[str]) -> FrozenSet[int]:
+        """Ids of the candidates named in recent_exercises; other names cannot be drawn anyway"""
+        if not recent_exercises:
+            return frozenset()
+        recent = {exercise.id for exercise in map(catalog.get, recent_exercises) if exercise is not None}
+        return frozenset(exercise.id for exercise in candidates if exercise.id in recent)
+
+    def _sample(self, rng, candidates: Sequence[Exercise], k: int, recent: FrozenSet[int]) -> List[Exercise]:
+        """k candidates without replacement, recent ones at RECENT_EXERCISE_WEIGHT"""
+        if not recent:
+            return rng.sample(candidates, k)
+        # Weighted sampling without replacement: keep the k largest u ** (1 / weight)
+        exponent = 1 / RECENT_EXERCISE_WEIGHT
+        keyed = [
+            (rng.random() ** exponent if exercise.id in recent else rng.random(), exercise)
+            for exercise in candidates
+        ]
+        return [exercise for _, exercise in heapq.nlargest(k, keyed, key=lambda item: item[0])]
+
     def _analyze_bmi(self, bmi: float) -> str:
         """Provide BMI analysis"""
-        if bmi < 18.5:
-            return "underweight"
-        elif 18.5 <= bmi < 25:
-            return "normal"
-        elif 25 <= bmi < 30:
-            return "overweight"
-        else:
-            return "obese"
-
-    def _generate_workout_structure(self, exercises: List[str], duration: int) -> List[Dict]:
+        for threshold, category in zip(BMI_THRESHOLDS, BMI_CATEGORIES):
+            if bmi < threshold:
+                return category
+        return BMI_CATEGORIES[-1]
+
+    def _structure_entry(self, exercise: Exercise) -> Dict:
+        return {
+            "exercise": exercise.name,
+            "sets": 3,
+            "reps": exercise.rep_scheme,
+            "rest": "30-60 seconds"
+        }
+
+    def _generate_workout_structure(self, exercises: List[Exercise], duration: int) -> List[Dict]:
         """Generate workout structure with sets and reps"""
-        structure = []
-        exercise_time = duration // len(exercises)  # Equal time per exercise
-        
-        for exercise in exercises:
-            structure.append({
-                "exercise": exercise,
-                "sets": 3,
-                "reps": "8-12" if "Push" in exercise or  "Pull" in exercise or "Squat" in exercise else "30-60 seconds",
-                "rest": "30-60 seconds"
-            })
-        
-        return structure
+        return [self._structure_entry(exercise) for exercise in exercises]
 
-    def _generate_recommendations(self, user_profile: Dict, bmi: float) -> List[str]:
+    def _recommendations_for(self, bmi_category: str, goal: str, fitness_level: str) -> List[str]:
         """Generate personalized recommendations"""
         recommendations = []
         
         # BMI-based recommendations
-        bmi_category = self._analyze_bmi(bmi)
         if bmi_category == "overweight" or bmi_category == "obese":
             recommendations.append("Focus on cardio and full-body workouts for weight loss")
         elif bmi_category == "underweight":
             recommendations.append("Include strength training to build muscle mass")
 
         # Goal-based recommendations
-        if user_profile['goals'] == 'weight_loss':
+        if goal == 'weight_loss':
             recommendations.append("Combine strength training with cardio for optimal fat loss")
-        elif user_profile['goals'] == 'muscle_gain':
+        elif goal == 'muscle_gain':
             recommendations.append("Focus on progressive overload and protein intake")
-        elif user_profile['goals'] == 'endurance':
+        elif goal == 'endurance':
             recommendations.append("Gradually increase workout duration and intensity")
         
         # Fitness level recommendations
-        if user_profile['fitness_level'] == 'beginner':
+        if fitness_level == 'beginner':
             recommendations.append("Start with 3 days per week and focus on proper form")
-        elif user_profile['fitness_level'] == 'intermediate':
+        elif fitness_level == 'intermediate':
             recommendations.append("Consider adding variety with supersets and circuits")
         
         return recommendations
 
+async def watch_catalog(generator: WorkoutGenerator, interval: float):
+    """Poll the generator's catalog file every `interval` seconds and hot-swap new versions"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(generator.reload_catalog)
+        except Exception:
+            logger.exception("Exercise catalog reload failed; keeping version %s", generator.catalog.version)
+
 # Create global instance
 workout_generator = WorkoutGenerator()
-        
\ No newline at end of file
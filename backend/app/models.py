@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, Text, Date, DateTime, Float, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship  
 from sqlalchemy.sql import func
@@ -14,11 +14,18 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped whenever the user's profile or workout history changes; see app.versions
+    data_version = Column(Integer, default=0, server_default="0", nullable=False)
     
     # Relationships
     workout_feedbacks = relationship("WorkoutFeedback", back_populates="user")
     profile = relationship("UserProfile", back_populates="user", uselist=False)
 
+    # Logins match emails case-insensitively
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email)),
+    )
+
 class UserProfile(Base):
     __tablename__ = "user_profiles"
     
@@ -94,4 +101,47 @@ class WorkoutFeedback(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship
-    user = relationship("User", back_populates="workout_feedbacks")
\ No newline at end of file
+    user = relationship("User", back_populates="workout_feedbacks")
+
+    # Every history read filters by user and orders by newest first
+    __table_args__ = (
+        Index("ix_workout_feedback_user_created", "user_id", created_at.desc()),
+    )
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    # Only the token id is stored; the secret half is an HMAC that is recomputed on use
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(32), unique=True, index=True, nullable=False)
+    family_id = Column(String(32), index=True, nullable=False)  # shared by every rotation of one login
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    revoked = Column(Boolean, default=False, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class UserWorkoutStats(Base):
+    __tablename__ = "user_workout_stats"
+
+    # Rollup of a user's workout_feedback rows, maintained in the log-workout transaction
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_workouts = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    duration_sum = Column(Integer, default=0, nullable=False)
+    difficulty_sum = Column(Integer, default=0, nullable=False)
+    last_workout_date = Column(Date)
+    current_streak = Column(Integer, default=0, nullable=False)  # consecutive days ending at last_workout_date
+    daily_counts = Column(JSON, default=dict)  # {"YYYY-MM-DD": count} for the trailing week
+    workout_type_counts = Column(JSON, default=dict)  # {workout_type: count}
+    recent_exercises = Column(JSON)  # ring of the last sessions' exercise names, see app.stats
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class UserNextPlan(Base):
+    __tablename__ = "user_next_plans"
+
+    # The user's next workout plan, rebuilt in the background after profile saves and workout logs
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    plan = Column(JSON, nullable=False)
+    seed = Column(JSON, nullable=False)  # generator seed the plan was built with
+    profile_updated_at = Column(DateTime)  # profile version it was built from
+    created_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
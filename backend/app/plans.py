@@ -0,0 +1,102 @@
+"""Each user's precomputed next workout plan (user_next_plans).
+
+Saving a fitness profile or logging a workout schedules refresh_next_plan as a
+background task, so /generate-workout usually reads a ready row. A row is only
+served while it matches the profile version and the seed the user would get
+now; otherwise the plan is built inline and stored (a cold miss). Plans steer
+away from the exercises in the user's recent_exercises ring (app.stats), which
+changes exactly when the workout count in the seed does.
+"""
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app.database import session_scope
+from app.ml.workout_generator import plan_seed, workout_generator
+from app.models import UserNextPlan, UserWorkoutStats
+from app.profiles import ProfileSnapshot, get_profile
+from app.stats import recent_sessions
+
+logger = logging.getLogger(__name__)
+
+def profile_data(profile: ProfileSnapshot) -> Dict:
+    """The profile fields the workout generator reads"""
+    return {
+        "age": profile.age,
+        "weight": profile.weight,
+        "height": profile.height,
+        "gender": profile.gender,
+        "fitness_level": profile.fitness_level,
+        "goals": profile.goals,
+        "workout_days": profile.workout_days,
+        "workout_duration": profile.workout_duration,
+        "injuries": profile.injuries,
+        "equipment": profile.equipment
+    }
+
+async def next_plan_inputs(db, user_id: int, today: date) -> Tuple[List, List[str]]:
+    """The seed for the user's next plan and the exercises of their recent sessions.
+
+    One plan per user per ISO week, moving on to a new one after each logged
+    workout. The catalog version is part of the seed, so stored plans go stale
+    when a new exercise catalog is loaded.
+    """
+    stats = await db.get(UserWorkoutStats, user_id)
+    if stats is None:
+        workouts, recent = 0, []
+    else:
+        workouts = stats.total_workouts
+        recent = [name for session in recent_sessions(stats.recent_exercises) for name in session]
+    return [*plan_seed(user_id, today), workouts, workout_generator.catalog.version], recent
+
+def upsert_next_plan(dialect_name: str, user_id: int, values: Dict):
+    """INSERT ... ON CONFLICT (user_id) DO UPDATE in the dialect's syntax.
+
+    A cold miss in get_next_plan and a background refresh_next_plan may both
+    store the first row for a user; a single statement lets the later one win
+    instead of failing on the primary key.
+    """
+    values = {**values, "created_at": datetime.utcnow()}
+    if dialect_name == "mysql":
+        return mysql.insert(UserNextPlan).values(user_id=user_id, **values).on_duplicate_key_update(**values)
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return (
+        insert(UserNextPlan)
+        .values(user_id=user_id, **values)
+        .on_conflict_do_update(index_elements=[UserNextPlan.user_id], set_=values)
+    )
+
+async def build_next_plan(db, user_id: int, profile: ProfileSnapshot, seed: List, recent: List[str]) -> Dict:
+    """Generate the plan and upsert the user's row, inside the caller's transaction"""
+    plan = workout_generator.generate_workout_plan(profile_data(profile), seed=tuple(seed), recent_exercises=recent)
+    await db.execute(upsert_next_plan(
+        db.get_bind().dialect.name, user_id,
+        {"plan": plan, "seed": seed, "profile_updated_at": profile.updated_at},
+    ))
+    return plan
+
+async def get_next_plan(db, user_id: int, profile: ProfileSnapshot, today: date) -> Tuple[Dict, bool]:
+    """The user's next plan and whether it was precomputed; builds and stores it on a cold miss"""
+    seed, recent = await next_plan_inputs(db, user_id, today)
+    row = await db.get(UserNextPlan, user_id)
+    if row is not None and row.seed == seed and row.profile_updated_at == profile.updated_at:
+        return row.plan, True
+
+    plan = await build_next_plan(db, user_id, profile, seed, recent)
+    await db.commit()
+    return plan, False
+
+async def refresh_next_plan(user_id: int):
+    """Background task: rebuild and store the user's next plan in a session of its own"""
+    try:
+        async with session_scope() as db:
+            profile = await get_profile(db, user_id)
+            if profile is None or not profile.weight or not profile.height:
+                return
+            seed, recent = await next_plan_inputs(db, user_id, datetime.utcnow().date())
+            await build_next_plan(db, user_id, profile, seed, recent)
+            await db.commit()
+        logger.debug("Precomputed next plan for user %s", user_id)
+    except Exception:
+        # A failed refresh only costs the next /generate-workout an inline build
+        logger.exception("Failed to precompute next plan for user %s", user_id)
@@ -0,0 +1,66 @@
+"""Per-user fitness profile cache.
+
+Most authenticated endpoints need the caller's profile, and profiles change
+rarely, so reads go through get_profile: an LRU keyed by user_id holding
+immutable ProfileSnapshots (or None for users without a profile). Saving a
+profile writes the new snapshot through with cache_profile after the commit.
+The cache is per process; the TTL bounds how long another worker can serve a
+profile saved elsewhere.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from app import config, queries
+from app.cache import LRUCache
+from app.models import UserProfile
+
+_MISSING = object()
+
+@dataclass(frozen=True, slots=True)
+class ProfileSnapshot:
+    """Immutable copy of a user_profiles row, safe to share across requests"""
+    id: int
+    user_id: int
+    age: Optional[int]
+    weight: Optional[float]
+    height: Optional[float]
+    gender: Optional[str]
+    fitness_level: Optional[str]
+    goals: Optional[str]
+    workout_days: Optional[int]
+    workout_duration: Optional[int]
+    activity_level: Optional[str]
+    injuries: Optional[str]
+    equipment: Optional[str]
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, profile: UserProfile) -> "ProfileSnapshot":
+        return cls(
+            id=profile.id, user_id=profile.user_id, age=profile.age, weight=profile.weight,
+            height=profile.height, gender=profile.gender, fitness_level=profile.fitness_level,
+            goals=profile.goals, workout_days=profile.workout_days, workout_duration=profile.workout_duration,
+            activity_level=profile.activity_level, injuries=profile.injuries, equipment=profile.equipment,
+            created_at=profile.created_at, updated_at=profile.updated_at,
+        )
+
+profile_cache = LRUCache(maxsize=config.PROFILE_CACHE_SIZE, ttl=config.PROFILE_CACHE_TTL_SECONDS)
+
+async def get_profile(db, user_id: int) -> Optional[ProfileSnapshot]:
+    """The user's profile snapshot, querying user_profiles only on a cache miss"""
+    snapshot = profile_cache.get(user_id, _MISSING)
+    if snapshot is _MISSING:
+        profile = await db.scalar(queries.user_profile(user_id))
+        snapshot = ProfileSnapshot.from_model(profile) if profile is not None else None
+        profile_cache.set(user_id, snapshot)
+    return snapshot
+
+def cache_profile(profile: UserProfile) -> ProfileSnapshot:
+    """Write a committed profile through to the cache"""
+    snapshot = ProfileSnapshot.from_model(profile)
+    profile_cache.set(profile.user_id, snapshot)
+    return snapshot
+
+def invalidate_profile(user_id: int):
+    profile_cache.pop(user_id)
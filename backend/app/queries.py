@@ -0,0 +1,137 @@
+import base64
+import zlib
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import extract, or_, select
+from sqlalchemy.orm import load_only
+from app.models import UserProfile, WorkoutFeedback
+
+# Statements for the hot per-user reads. Routers build their queries here so
+# test_query_plans.py can check that each one stays on an index.
+
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+# Fields the workout list can return, and the columns each one needs loaded
+WORKOUT_LIST_FIELDS = {
+    "id": ("id",),
+    "workout_name": ("workout_name",),
+    "workout_type": ("workout_type",),
+    "duration_minutes": ("duration_minutes",),
+    "difficulty_rating": ("difficulty_rating",),
+    "energy_level": ("energy_level",),
+    "completion_rate": ("completion_data",),
+    "exercise_count": ("completion_data",),
+    "rating": ("rating",),
+    "personal_notes": ("personal_notes",),
+    "created_at": ("created_at",),
+    "feedback_text": ("feedback_text",),
+    "workout_plan": ("workout_plan",),
+    "exercises_logged": ("exercises_logged",),
+}
+# The list view leaves the large plan/log JSON to /workout-details unless asked for
+DEFAULT_WORKOUT_LIST_FIELDS = tuple(
+    name for name in WORKOUT_LIST_FIELDS if name not in ("workout_plan", "exercises_logged")
+)
+
+def user_profile(user_id: int):
+    return select(UserProfile).where(UserProfile.user_id == user_id)
+
+def workout_history(user_id: int):
+    """A user's workouts, newest first (served by ix_workout_feedback_user_created)"""
+    return (
+        select(WorkoutFeedback)
+        .where(WorkoutFeedback.user_id == user_id)
+        .order_by(WorkoutFeedback.created_at.desc())
+    )
+
+def recent_workouts(user_id: int, limit: int):
+    """The newest `limit` workouts with only completion_data loaded, for feedback trends"""
+    return (
+        workout_history(user_id)
+        .options(load_only(WorkoutFeedback.completion_data, WorkoutFeedback.created_at, raiseload=True))
+        .limit(limit)
+    )
+
+def workout_series(user_id: int):
+    """Numeric columns for the analytics arrays: epoch seconds and JSON completion counts come from SQL.
+
+    Unordered: WorkoutSeries sorts by (created_at, id) itself.
+    """
+    return (
+        select(
+            WorkoutFeedback.id,
+            extract("epoch", WorkoutFeedback.created_at),
+            WorkoutFeedback.rating,
+            WorkoutFeedback.duration_minutes,
+            WorkoutFeedback.difficulty_rating,
+            WorkoutFeedback.completion_data["completed_exercises"].as_float(),
+            WorkoutFeedback.completion_data["total_exercises"].as_float(),
+        )
+        .where(WorkoutFeedback.user_id == user_id)
+    )
+
+def parse_workout_fields(raw: Optional[str]) -> Tuple[str, ...]:
+    """Comma-separated fields= value to a tuple of list fields; raises ValueError on unknown names"""
+    if not raw:
+        return DEFAULT_WORKOUT_LIST_FIELDS
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in WORKOUT_LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def encode_cursor(workout: WorkoutFeedback) -> str:
+    return base64.urlsafe_b64encode(str(workout.id).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def history_page_key(limit: int, cursor: Optional[str], fields: Iterable[str]) -> str:
+    """Normalized name of one /my-workouts page (size, position and fields), e.g. for its ETag"""
+    after = decode_cursor(cursor) if cursor is not None else 0
+    return f"{limit}-{after}-{zlib.crc32(','.join(fields).encode()):08x}"
+
+def workout_history_page(user_id: int, limit: int, cursor: Optional[str] = None,
+                         fields: Iterable[str] = DEFAULT_WORKOUT_LIST_FIELDS):
+    """One keyset page of a user's workouts, loading only the columns `fields` needs.
+
+    Ordered by (created_at DESC, id ASC): SQLite keeps the rowid ascending inside
+    each created_at run of the index, so the tie-break needs no extra sort. Fetches
+    limit + 1 rows so the caller can tell whether another page follows.
+    """
+    columns = {"id", "created_at"}  # always loaded, the cursor is built from them
+    for name in fields:
+        columns.update(WORKOUT_LIST_FIELDS[name])
+
+    statement = (
+        select(WorkoutFeedback)
+        .options(load_only(*(getattr(WorkoutFeedback, column) for column in sorted(columns)), raiseload=True))
+        .where(WorkoutFeedback.user_id == user_id)
+        .order_by(WorkoutFeedback.created_at.desc(), WorkoutFeedback.id.asc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        # Compare against the stored timestamp of the cursor row rather than a
+        # round-tripped datetime, whose text form may not match the column's
+        workout_id = decode_cursor(cursor)
+        cursor_created_at = (
+            select(WorkoutFeedback.created_at)
+            .where(WorkoutFeedback.id == workout_id, WorkoutFeedback.user_id == user_id)
+            .scalar_subquery()
+        )
+        # Written as a range plus a tie filter so the index seeks straight to the cursor
+        statement = statement.where(
+            WorkoutFeedback.created_at <= cursor_created_at,
+            or_(WorkoutFeedback.created_at < cursor_created_at, WorkoutFeedback.id > workout_id),
+        )
+    return statement
+
+def user_workout(user_id: int, workout_id: int):
+    return select(WorkoutFeedback).where(
+        WorkoutFeedback.id == workout_id,
+        WorkoutFeedback.user_id == user_id
+    )
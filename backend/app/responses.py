@@ -0,0 +1,78 @@
+"""JSON response classes.
+
+FastJSONResponse is the app's default response class. It renders with
+dumps(): orjson when that is installed (falling back to the stdlib encoder),
+and the heavy history endpoints return it directly so their large JSON blobs
+skip FastAPI's jsonable_encoder walk as well. Those routes document their shape
+with responses= rather than response_model, which would validate nothing.
+
+StaticJSON encodes its payload once with the same dumps(), when the module defining it is imported
+at startup, and serves the same bytes on every request with a strong ETag
+(a hash of the bytes) and a Cache-Control lifetime, so browsers and proxies
+can reuse or revalidate it. A matching If-None-Match gets an empty 304.
+not_modified and revalidation_headers do the same for per-user responses
+tagged by app.versions.
+"""
+import hashlib
+import json
+from typing import Any, Optional
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STATIC_MAX_AGE_SECONDS = 3600
+
+# Per-user responses may be stored by the client only, and must be revalidated on every use
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check with the weak comparison RFC 9110 prescribes for it"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+def revalidation_headers(etag: str):
+    return {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """An empty 304 when the request's If-None-Match matches etag, else None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=revalidation_headers(etag))
+    return None
+
+def dumps(content: Any) -> bytes:
+    """The app's JSON encoding: orjson with non-str keys and NumPy values when available"""
+    if orjson is None:
+        # Same encoding as Starlette's JSONResponse
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by dumps(); also handles NumPy scalars and arrays"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class StaticJSON:
+    """A constant JSON payload, encoded once"""
+
+    def __init__(self, content: Any, max_age: int = STATIC_MAX_AGE_SECONDS):
+        self.body = dumps(content)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.headers = {"ETag": self.etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    def response(self, request: Request) -> Response:
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.body, media_type="application/json", headers=self.headers)
+
+    def uncached_response(self) -> Response:
+        """The encoded body without validators, for methods that must not be cached or revalidated"""
+        return Response(self.body, media_type="application/json")
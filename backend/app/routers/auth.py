@@ -1,12 +1,25 @@
 # backend/app/routers/auth.py
+import base64
+import hashlib
+import hmac
+import logging
+import math
+import secrets
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import JWTError, jwt
-from app.database import get_db
-from app import schemas, models
-from passlib.context import CryptContext
+from app.cache import LRUCache
+from app.database import connection_released, get_db
+from app import config, schemas, models
+from app.security import HasherSaturated, password_hasher
+from app.throttle import TokenBucketLimiter
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -14,39 +27,117 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 SECRET_KEY = "fitgoalz-secret-key-2024"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = 30
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Verified-principal cache: SHA-256 of the token -> user snapshot, never outliving
+# the token's exp; hashing keeps live bearer tokens out of process memory dumps
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_TTL_SECONDS = 300
+
+@dataclass(frozen=True, slots=True)
+class AuthenticatedUser:
+    """Immutable snapshot of the authenticated user, safe to share across requests"""
+    id: int
+    username: str
+    email: str
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, user: models.User) -> "AuthenticatedUser":
+        return cls(id=user.id, username=user.username, email=user.email, created_at=user.created_at)
+
+principal_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+def token_cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def invalidate_user_tokens(user_id: int) -> int:
+    """Drop cached principals for a user after their account changes"""
+    return principal_cache.pop_matching(lambda principal: principal.id == user_id)
+
+# Login admission control, applied before any database or bcrypt work
+login_ip_limiter = TokenBucketLimiter(
+    config.LOGIN_IP_RATE_PER_MINUTE, config.LOGIN_IP_BURST, max_keys=config.LOGIN_THROTTLE_MAX_KEYS
+)
+login_email_limiter = TokenBucketLimiter(
+    config.LOGIN_EMAIL_RATE_PER_MINUTE, config.LOGIN_EMAIL_BURST, max_keys=config.LOGIN_THROTTLE_MAX_KEYS
+)
+unknown_email_cache = LRUCache(maxsize=config.LOGIN_THROTTLE_MAX_KEYS, ttl=config.UNKNOWN_EMAIL_CACHE_TTL_SECONDS)
+
+def _too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts, please retry later",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+def normalize_email(email: str) -> str:
+    """Key for login throttles and caches, so "Bob@X.com " and "bob@x.com" share one budget"""
+    return email.strip().lower()
+
+def admit_login_attempt(client_ip: str, email: str):
+    """Charge the caller's IP and the target email; raises 429 when either is over budget"""
+    allowed, retry_after = login_ip_limiter.acquire(client_ip)
+    if not allowed:
+        logger.info("Login throttled for ip %s", client_ip)
+        raise _too_many_requests(retry_after)
+    allowed, retry_after = login_email_limiter.acquire(email)
+    if not allowed:
+        logger.info("Login throttled for email %s", email)
+        raise _too_many_requests(retry_after)
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
 # Password verification
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    print(f"🔐 VERIFY_PASSWORD CALLED")
-    print(f"   Plain password: {plain_password}")
-    print(f"   Hashed password: {hashed_password}")
-    
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     if not plain_password or not hashed_password:
-        print("❌ Missing password or hash")
+        logger.debug("Missing password or hash")
         return False
     
     try:
-        result = pwd_context.verify(plain_password, hashed_password)
-        print(f"✅ Password verification result: {result}")
+        result = await password_hasher.verify(plain_password, hashed_password)
+        logger.debug("Password verification result: %s", result)
         return result
+    except HasherSaturated:
+        logger.warning("Password hasher saturated (%d pending)", password_hasher.pending)
+        raise _hasher_busy()
     except Exception as e:
-        print(f"❌ Password verification error: {str(e)}")
+        logger.warning("Password verification error: %s", e)
         return False
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    try:
+        return await password_hasher.hash(password)
+    except HasherSaturated:
+        logger.warning("Password hasher saturated (%d pending)", password_hasher.pending)
+        raise _hasher_busy()
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(models.User).where(func.lower(models.User.email) == normalize_email(email)))
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = get_user_by_email(db, email)
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    # Recently seen unknown emails are rejected without a query
+    email_key = normalize_email(email)
+    if unknown_email_cache.get(email_key) is not None:
+        return False
+    user = await get_user_by_email(db, email)
     if not user:
+        unknown_email_cache.set(email_key, True)
+        logger.debug("Login failed, unknown email: %s", email)
         return False
-    if not verify_password(password, user.password_hash):
+    
+    # Return the pooled connection while bcrypt runs; the user row is already loaded
+    async with connection_released(db):
+        verified = await verify_password(password, user.password_hash)
+    if not verified:
+        logger.debug("Login failed, wrong password for user %s", user.id)
         return False
     return user
 
@@ -60,62 +151,99 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Refresh tokens are "<jti>.<hmac(jti)>": the HMAC rejects forged tokens without
+# touching the database, and only the jti is stored server-side
+def _sign_refresh_id(jti: str) -> str:
+    digest = hmac.new(SECRET_KEY.encode(), jti.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+def _parse_refresh_token(token: str) -> Optional[str]:
+    jti, _, signature = token.partition(".")
+    if not jti or not signature or not hmac.compare_digest(signature, _sign_refresh_id(jti)):
+        return None
+    return jti
+
+def create_refresh_token(db: AsyncSession, user_id: int, family_id: Optional[str] = None) -> str:
+    """Stage a new refresh token row (caller commits) and return the token string"""
+    jti = secrets.token_hex(16)
+    db.add(models.RefreshToken(
+        jti=jti,
+        family_id=family_id or secrets.token_hex(16),
+        user_id=user_id,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return f"{jti}.{_sign_refresh_id(jti)}"
+
+async def revoke_refresh_family(db: AsyncSession, family_id: str) -> int:
+    result = await db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.family_id == family_id, models.RefreshToken.revoked == False)
+        .values(revoked=True)
+    )
+    return result.rowcount
+
+async def _prune_refresh_tokens(db: AsyncSession, user_id: int):
+    await db.execute(
+        delete(models.RefreshToken)
+        .where(models.RefreshToken.user_id == user_id, models.RefreshToken.expires_at < datetime.utcnow())
+    )
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    print(f"🔍 DEBUG get_current_user called")
-    print(f"🔍 DEBUG Token received: {token}")
-    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Not authenticated",
     )
     
     if not token or token == "null" or token == "undefined":
-        print("🔍 DEBUG: No token provided or token is null/undefined")
+        logger.debug("No token provided or token is null/undefined")
         raise credentials_exception
     
+    # Warm path: token already verified and user already loaded
+    cache_key = token_cache_key(token)
+    principal = principal_cache.get(cache_key)
+    if principal is not None:
+        return principal
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        print(f"🔍 DEBUG Token payload email: {email}")
-        
         if email is None:
             raise credentials_exception
             
     except JWTError as e:
-        print(f"🔍 DEBUG JWT Error: {e}")
+        logger.debug("JWT error: %s", e)
         raise credentials_exception
     
-    user = get_user_by_email(db, email=email)
+    user = await get_user_by_email(db, email=email)
     if user is None:
-        print(f"🔍 DEBUG User not found for email: {email}")
+        logger.debug("User not found for token subject %s", email)
         raise credentials_exception
         
-    print(f"🔍 DEBUG Authentication successful for user: {user.email}")
-    return user
+    logger.debug("Authenticated user %s", user.id)
+    principal = AuthenticatedUser.from_model(user)
+    principal_cache.set(cache_key, principal, expires_at=payload.get("exp"))
+    return principal
 
 # Registration endpoint
 @router.post("/register", response_model=schemas.User)
-async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    print("=== 🔍 REGISTRATION DEBUG START ===")
-    print(f"📧 Registering user: {user.email}")
-    print(f"👤 Username: {user.username}")
-    print(f"🔑 Plain password: {user.password}")
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    logger.debug("Registering user %s", user.email)
     
     # Check if user exists
-    db_user = get_user_by_email(db, email=user.email)
+    db_user = await get_user_by_email(db, email=user.email)
     if db_user:
-        print("❌ USER ALREADY EXISTS")
+        logger.debug("Registration rejected, email already exists: %s", user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Hash password and create user
-    hashed_password = get_password_hash(user.password)
-    print(f"🔐 Hashed password: {hashed_password}")
+    # Hash password and create user (without holding a pooled connection)
+    async with connection_released(db):
+        hashed_password = await get_password_hash(user.password)
     
     db_user = models.User(
         email=user.email,
@@ -123,79 +251,135 @@ async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
         password_hash=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    unknown_email_cache.pop(normalize_email(user.email))
     
-    print("✅ REGISTRATION SUCCESSFUL")
-    print("=== 🔍 REGISTRATION DEBUG END ===")
+    logger.info("Registered user %s", db_user.id)
     return db_user
 
 # Login endpoint
 @router.post("/login")
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    print("=== 🔍 LOGIN DEBUG START ===")
-    print(f"📧 Username received: {form_data.username}")
-    print(f"🔑 Password received: {form_data.password}")
+    client_ip = request.client.host if request.client else "unknown"
+    admit_login_attempt(client_ip, normalize_email(form_data.username))
     
-    user = get_user_by_email(db, form_data.username)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
-        print("❌ USER NOT FOUND IN DATABASE")
-        print("=== 🔍 LOGIN DEBUG END ===")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
         )
     
-    print(f"✅ User found in database: {user.email}")
-    print(f"🔐 Stored password hash: {user.password_hash}")
-    
-    # Debug password verification
-    print("🔍 Verifying password...")
-    password_correct = pwd_context.verify(form_data.password, user.password_hash)
-    print(f"🔍 Password verification result: {password_correct}")
-    
-    if not password_correct:
-        print("❌ PASSWORD VERIFICATION FAILED")
-        print("=== 🔍 LOGIN DEBUG END ===")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-        )
-    
-    print("🎉 LOGIN SUCCESSFUL - Password matches!")
-    print("=== 🔍 LOGIN DEBUG END ===")
+    logger.debug("Login successful for user %s", user.id)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
     
+    await _prune_refresh_tokens(db, user.id)
+    refresh_token = create_refresh_token(db, user.id)
+    await db.commit()
+    
     return {
         "access_token": access_token,
         "token_type": "bearer", 
         "user_id": user.id,
-        "email": user.email
+        "email": user.email,
+        "refresh_token": refresh_token
     }
 
+# Refresh endpoint - rotates the refresh token without re-checking the password
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh_access_token(
+    body: schemas.RefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+    )
+    
+    jti = _parse_refresh_token(body.refresh_token)
+    if jti is None:
+        raise invalid_token
+    
+    row = (await db.execute(
+        select(models.RefreshToken, models.User.email)
+        .join(models.User, models.User.id == models.RefreshToken.user_id)
+        .where(models.RefreshToken.jti == jti)
+    )).first()
+    if row is None:
+        raise invalid_token
+    stored, email = row
+    
+    if stored.expires_at <= datetime.utcnow():
+        raise invalid_token
+    
+    # Claim the token atomically; losing the race or replaying a rotated token
+    # means it has leaked, so the whole login family is revoked
+    claimed = (await db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.id == stored.id, models.RefreshToken.revoked == False)
+        .values(revoked=True)
+    )).rowcount
+    if not claimed:
+        await revoke_refresh_family(db, stored.family_id)
+        await db.commit()
+        invalidate_user_tokens(stored.user_id)
+        logger.warning("Refresh token reuse detected for user %s; family revoked", stored.user_id)
+        raise invalid_token
+    
+    refresh_token = create_refresh_token(db, stored.user_id, family_id=stored.family_id)
+    await db.commit()
+    
+    return {
+        "access_token": create_access_token(data={"sub": email}),
+        "token_type": "bearer",
+        "user_id": stored.user_id,
+        "email": email,
+        "refresh_token": refresh_token
+    }
+
+# Logout endpoint - revokes every refresh token issued from the same login
+@router.post("/logout")
+async def logout(
+    body: schemas.RefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    jti = _parse_refresh_token(body.refresh_token)
+    if jti is not None:
+        row = (await db.execute(
+            select(models.RefreshToken.family_id, models.RefreshToken.user_id)
+            .where(models.RefreshToken.jti == jti)
+        )).first()
+        if row is not None:
+            await revoke_refresh_family(db, row.family_id)
+            await db.commit()
+            invalidate_user_tokens(row.user_id)
+    return {"message": "Logged out"}
+
 # Protected endpoint - get current user
 @router.get("/me", response_model=schemas.User)
-async def read_users_me(current_user: models.User = Depends(get_current_user)):
+async def read_users_me(current_user: AuthenticatedUser = Depends(get_current_user)):
     return current_user
 
 # Simple token test endpoint
 @router.get("/test-token-simple")
 async def test_token_simple(
     token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Test endpoint that accepts token as query parameter"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        user = get_user_by_email(db, email=email)
+        user = await get_user_by_email(db, email=email)
         return {
             "success": True,
             "message": "Token is valid!",
@@ -225,7 +409,7 @@ async def test_public():
     return {"message": "This is a public endpoint - no auth needed"}
 
 @router.get("/test-protected")
-async def test_protected(current_user: models.User = Depends(get_current_user)):
+async def test_protected(current_user: AuthenticatedUser = Depends(get_current_user)):
     return {
         "message": "This is a protected endpoint", 
         "user": current_user.email,
@@ -234,8 +418,8 @@ async def test_protected(current_user: models.User = Depends(get_current_user)):
     }
 
 @router.get("/debug/users")
-async def debug_users(db: Session = Depends(get_db)):
-    users = db.query(User).all()
+async def debug_users(db: AsyncSession = Depends(get_db)):
+    users = (await db.scalars(select(models.User))).all()
     return {
         "users": [
             {
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import queries, schemas
+from app.analytics import WorkoutSeries, progress_trends
 from app.database import get_db
-from app.models import User, WorkoutFeedback, UserProfile
-from app.routers.auth import get_current_user
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-import json
+from app.plans import refresh_next_plan
+from app.responses import FastJSONResponse, not_modified, revalidation_headers
+from app.profiles import ProfileSnapshot, get_profile
+from app.models import WorkoutFeedback, UserWorkoutStats
+from app.routers.auth import AuthenticatedUser, get_current_user
+from app.stats import apply_workout, summarize_stats
+from app.versions import bump_data_version, user_etag
+from typing import List, Dict, Any, Optional
+from datetime import datetime
 
 router = APIRouter()
 
@@ -32,8 +38,13 @@ class EnhancedFeedbackGenerator:
             }
         }
 
-    def generate_comprehensive_feedback(self, workout_data: Dict, user_profile: UserProfile, workout_history: List) -> Dict:
-        """Generate enhanced feedback with progress tracking"""
+    def generate_comprehensive_feedback(self, workout_data: Dict, user_profile: ProfileSnapshot,
+                                        recent_workouts: List, stats: Optional[Dict]) -> Dict:
+        """Generate enhanced feedback with progress tracking.
+
+        recent_workouts is the newest RECENT_WORKOUTS_FOR_FEEDBACK rows, newest first;
+        stats is summarize_stats() of the user's rollup before this workout.
+        """
         
         workout_plan = workout_data.get('workout_plan', {})
         completion_data = workout_data.get('completion_data', {})
@@ -59,7 +70,7 @@ class EnhancedFeedbackGenerator:
             rating = 3
 
         # Add progress-based feedback
-        progress_feedback = self._generate_progress_feedback(workout_history, completion_rate, user_profile)
+        progress_feedback = self._generate_progress_feedback(recent_workouts, completion_rate, user_profile)
         
         # Add goal-specific feedback
         goal_feedback = self._get_goal_feedback(user_profile.goals, completion_rate)
@@ -75,18 +86,18 @@ class EnhancedFeedbackGenerator:
             "rating": rating,
             "completion_rate": completion_rate,
             "suggestions": self._generate_suggestions(workout_plan, user_profile),
-            "progress_metrics": self._calculate_progress_metrics(workout_history, workout_data)
+            "progress_metrics": self._calculate_progress_metrics(stats, workout_data)
         }
 
-    def _generate_progress_feedback(self, workout_history: List, current_completion: float, user_profile: UserProfile) -> str:
+    def _generate_progress_feedback(self, recent_workouts: List, current_completion: float, user_profile: ProfileSnapshot) -> str:
         """Generate feedback based on user's progress over time"""
-        if len(workout_history) < 2:
+        if len(recent_workouts) < 2:
             return "Keep logging workouts to track your progress!"
         
         # Calculate average completion from previous workouts
         previous_completions = [fb.completion_data.get('completed_exercises', 0) / 
                                fb.completion_data.get('total_exercises', 1) * 100 
-                               for fb in workout_history[1:6]]  # Last 5 workouts
+                               for fb in recent_workouts[1:6]]  # Last 5 workouts
         
         if previous_completions:
             avg_previous = sum(previous_completions) / len(previous_completions)
@@ -97,9 +108,9 @@ class EnhancedFeedbackGenerator:
         
         return "You're maintaining consistent performance. Keep it up!"
 
-    def _calculate_progress_metrics(self, workout_history: List, current_workout: Dict) -> Dict:
+    def _calculate_progress_metrics(self, stats: Optional[Dict], current_workout: Dict) -> Dict:
         """Calculate progress metrics for the user"""
-        if not workout_history:
+        if not stats:
             return {
                 "workout_streak": 0,
                 "weekly_workouts": 0,
@@ -107,44 +118,13 @@ class EnhancedFeedbackGenerator:
                 "total_workouts": 0
             }
         
-        # Calculate streak
-        streak = self._calculate_streak(workout_history)
-        
-        # Calculate weekly workouts
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        weekly_workouts = len([w for w in workout_history if w.created_at >= week_ago])
-        
-        # Consistency score (0-100)
-        total_workouts = len(workout_history)
-        consistency_score = min(100, (weekly_workouts / 3) * 100)  # Based on 3 workouts/week goal
-        
         return {
-            "workout_streak": streak,
-            "weekly_workouts": weekly_workouts,
-            "consistency_score": consistency_score,
-            "total_workouts": total_workouts + 1  # +1 for current workout
+            "workout_streak": stats["current_streak"],
+            "weekly_workouts": stats["weekly_workouts"],
+            "consistency_score": stats["consistency_score"],
+            "total_workouts": stats["total_workouts"] + 1  # +1 for current workout
         }
 
-    def _calculate_streak(self, workout_history: List) -> int:
-        """Calculate current workout streak in days"""
-        if not workout_history:
-            return 0
-        
-        streak = 0
-        current_date = datetime.utcnow().date()
-        sorted_history = sorted(workout_history, key=lambda x: x.created_at, reverse=True)
-        
-        for workout in sorted_history:
-            workout_date = workout.created_at.date()
-            days_diff = (current_date - workout_date).days
-            
-            if days_diff == streak:
-                streak += 1
-            else:
-                break
-        
-        return streak
-
     def _get_goal_feedback(self, goal: str, completion_rate: float) -> str:
         goal_feedbacks = {
             'weight_loss': f"Your consistency ({completion_rate:.1f}% completion) is great for weight loss. Keep focusing on full-body workouts.",
@@ -154,7 +134,7 @@ class EnhancedFeedbackGenerator:
         }
         return goal_feedbacks.get(goal, goal_feedbacks['general_fitness'])
     
-    def _generate_suggestions(self, workout_plan: Dict, user_profile: UserProfile) -> List[str]:
+    def _generate_suggestions(self, workout_plan: Dict, user_profile: ProfileSnapshot) -> List[str]:
         suggestions = []
         
         # Exercise variety suggestion
@@ -178,26 +158,31 @@ class EnhancedFeedbackGenerator:
 # Global instance
 feedback_generator = EnhancedFeedbackGenerator()
 
+# The trend compares against recent_workouts[1:6]
+RECENT_WORKOUTS_FOR_FEEDBACK = 6
+
 @router.post("/log-workout")
 async def log_workout_with_feedback(
     workout_data: dict,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Enhanced: Log workout and generate AI feedback in one call"""
     
     # Get user profile for personalized feedback
-    user_profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    user_profile = await get_profile(db, current_user.id)
     if not user_profile:
         raise HTTPException(status_code=400, detail="Please complete your fitness profile first")
     
-    # Get workout history for progress tracking
-    workout_history = db.query(WorkoutFeedback).filter(
-        WorkoutFeedback.user_id == current_user.id
-    ).order_by(WorkoutFeedback.created_at.desc()).all()
+    # Bounded inputs for progress tracking: a few recent rows plus the stats rollup
+    recent_workouts = (await db.scalars(
+        queries.recent_workouts(current_user.id, RECENT_WORKOUTS_FOR_FEEDBACK)
+    )).all()
+    stats = summarize_stats(await db.get(UserWorkoutStats, current_user.id), datetime.utcnow().date())
     
     # Generate comprehensive feedback with progress tracking
-    feedback = feedback_generator.generate_comprehensive_feedback(workout_data, user_profile, workout_history)
+    feedback = feedback_generator.generate_comprehensive_feedback(workout_data, user_profile, recent_workouts, stats)
     
     # Store enhanced workout log with feedback
     workout_feedback = WorkoutFeedback(
@@ -218,8 +203,12 @@ async def log_workout_with_feedback(
     )
     
     db.add(workout_feedback)
-    db.commit()
-    db.refresh(workout_feedback)
+    await db.flush()
+    await apply_workout(db, workout_feedback, datetime.utcnow())
+    await bump_data_version(db, current_user.id)
+    await db.commit()
+    await db.refresh(workout_feedback)
+    background_tasks.add_task(refresh_next_plan, current_user.id)
     
     return {
         "message": "Workout logged and feedback generated successfully",
@@ -231,107 +220,138 @@ async def log_workout_with_feedback(
 @router.post("/workout-feedback")
 async def submit_workout_feedback(
     feedback_data: dict,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Original endpoint maintained for backward compatibility"""
-    return await log_workout_with_feedback(feedback_data, current_user, db)
+    return await log_workout_with_feedback(feedback_data, background_tasks, current_user, db)
+
+def _completion_rate(workout: WorkoutFeedback) -> float:
+    completion_data = workout.completion_data or {}
+    return round((completion_data.get('completed_exercises', 0) / completion_data.get('total_exercises', 1) * 100), 1)
+
+# How each /my-workouts field is rendered from a (partially loaded) row
+WORKOUT_LIST_VALUES = {
+    "id": lambda workout: workout.id,
+    "workout_name": lambda workout: workout.workout_name,
+    "workout_type": lambda workout: workout.workout_type,
+    "duration_minutes": lambda workout: workout.duration_minutes,
+    "difficulty_rating": lambda workout: workout.difficulty_rating,
+    "energy_level": lambda workout: workout.energy_level,
+    "completion_rate": _completion_rate,
+    "exercise_count": lambda workout: (workout.completion_data or {}).get('total_exercises', 0),
+    "rating": lambda workout: workout.rating,
+    "personal_notes": lambda workout: workout.personal_notes,
+    "created_at": lambda workout: workout.created_at.isoformat(),
+    "feedback_text": lambda workout: workout.feedback_text,
+    "workout_plan": lambda workout: workout.workout_plan,
+    "exercises_logged": lambda workout: workout.exercises_logged,
+}
 
-@router.get("/my-workouts")
+@router.get("/my-workouts", responses={200: {"model": schemas.WorkoutHistoryPage}})
 async def get_my_workouts(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    limit: int = Query(queries.HISTORY_PAGE_SIZE, ge=1, le=queries.HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get user's workout history with enhanced data"""
-    workouts = db.query(WorkoutFeedback).filter(
-        WorkoutFeedback.user_id == current_user.id
-    ).order_by(WorkoutFeedback.created_at.desc()).all()
+    """Get user's workout history with enhanced data, newest first, one page at a time"""
+    try:
+        selected = queries.parse_workout_fields(fields)
+        statement = queries.workout_history_page(current_user.id, limit, cursor, selected)
+        page_key = queries.history_page_key(limit, cursor, selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Each page is its own representation, so the tag names the page as well as the version
+    etag = await user_etag(db, current_user.id, "my-workouts", page_key)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    workouts = (await db.scalars(statement)).all()
+    # The rollup row carries the count, so paging does not COUNT the whole history each time
+    stats = await db.get(UserWorkoutStats, current_user.id)
+    total_workouts = stats.total_workouts if stats is not None else 0
     
     # Handle empty workout history gracefully
-    if not workouts:
-        return {
+    if not workouts and cursor is None:
+        return FastJSONResponse({
             "total_workouts": 0,
             "workouts": [],
+            "next_cursor": None,
             "message": "No workouts logged yet. Complete your first workout to see your history here!"
-        }
+        }, headers=revalidation_headers(etag))
     
-    return {
-        "total_workouts": len(workouts),
+    page = workouts[:limit]
+    return FastJSONResponse({
+        "total_workouts": total_workouts,
         "workouts": [
-            {
-                "id": workout.id,
-                "workout_name": workout.workout_name,
-                "workout_type": workout.workout_type,
-                "duration_minutes": workout.duration_minutes,
-                "difficulty_rating": workout.difficulty_rating,
-                "energy_level": workout.energy_level,
-                "completion_rate": round((workout.completion_data.get('completed_exercises', 0) / workout.completion_data.get('total_exercises', 1) * 100), 1),
-                "rating": workout.rating,
-                "personal_notes": workout.personal_notes,
-                "created_at": workout.created_at.isoformat(),
-                "feedback_text": workout.feedback_text
-            }
-            for workout in workouts
-        ]
-    }
+            {name: WORKOUT_LIST_VALUES[name](workout) for name in selected}
+            for workout in page
+        ],
+        "next_cursor": queries.encode_cursor(page[-1]) if len(workouts) > limit else None
+    }, headers=revalidation_headers(etag))
     
 @router.get("/progress-analytics")
 async def get_progress_analytics(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Enhanced progress analytics with workout logging data"""
-    workouts = db.query(WorkoutFeedback).filter(
-        WorkoutFeedback.user_id == current_user.id
-    ).all()
+    # Streak and weekly figures are relative to today, so the date is part of the tag
+    today = datetime.utcnow().date()
+    etag = await user_etag(db, current_user.id, "progress-analytics", today.isoformat())
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers.update(revalidation_headers(etag))
+
+    stats = await db.get(UserWorkoutStats, current_user.id)
+    analytics = summarize_stats(stats, today)
     
-    if not workouts:
+    if analytics is None:
         return {"message": "No workout data available yet"}
     
-    # Calculate enhanced analytics
-    total_workouts = len(workouts)
-    average_rating = sum(w.rating for w in workouts) / total_workouts
-    average_duration = sum(w.duration_minutes for w in workouts) / total_workouts
-    average_difficulty = sum(w.difficulty_rating for w in workouts) / total_workouts
-    
-    # Calculate streak and consistency
-    streak = feedback_generator._calculate_streak(workouts)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    weekly_workouts = len([w for w in workouts if w.created_at >= week_ago])
-    consistency_score = min(100, (weekly_workouts / 3) * 100)
-    
-    # Most common workout type
-    workout_types = [w.workout_type for w in workouts]
-    most_common_type = max(set(workout_types), key=workout_types.count) if workout_types else "None"
-    
     return {
-        "total_workouts": total_workouts,
-        "average_rating": round(average_rating, 1),
-        "average_duration": round(average_duration, 1),
-        "average_difficulty": round(average_difficulty, 1),
-        "current_streak": streak,
-        "weekly_workouts": weekly_workouts,
-        "consistency_score": consistency_score,
-        "most_common_workout_type": most_common_type,
-        "progress_trend": "improving" if total_workouts > 3 and average_rating >= 4 else "starting"
+        "total_workouts": analytics["total_workouts"],
+        "average_rating": round(analytics["average_rating"], 1),
+        "average_duration": round(analytics["average_duration"], 1),
+        "average_difficulty": round(analytics["average_difficulty"], 1),
+        "current_streak": analytics["current_streak"],
+        "weekly_workouts": analytics["weekly_workouts"],
+        "consistency_score": analytics["consistency_score"],
+        "most_common_workout_type": analytics["most_common_workout_type"],
+        "progress_trend": "improving" if analytics["total_workouts"] > 3 and analytics["average_rating"] >= 4 else "starting"
     }
 
-@router.get("/workout-details/{workout_id}")
+@router.get("/progress-trends")
+async def get_progress_trends(
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Best/current streak, moving averages and 4/12-week trends over the full history"""
+    rows = (await db.execute(queries.workout_series(current_user.id))).all()
+    return progress_trends(WorkoutSeries.from_rows(rows), datetime.utcnow().date())
+
+@router.get("/workout-details/{workout_id}", responses={200: {"model": schemas.WorkoutDetails}})
 async def get_workout_details(
     workout_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get detailed information about a specific workout"""
-    workout = db.query(WorkoutFeedback).filter(
-        WorkoutFeedback.id == workout_id,
-        WorkoutFeedback.user_id == current_user.id
-    ).first()
+    workout = await db.scalar(queries.user_workout(current_user.id, workout_id))
     
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
     
-    return {
+    return FastJSONResponse({
         "workout_details": {
             "id": workout.id,
             "workout_name": workout.workout_name,
@@ -349,7 +369,7 @@ async def get_workout_details(
             "feedback_text": workout.feedback_text,
             "rating": workout.rating
         }
-    }
+    })
 
 @router.get("/")
 async def get_feedback_info():
@@ -360,6 +380,7 @@ async def get_feedback_info():
             "POST /workout-feedback": "Legacy endpoint for feedback only",
             "GET /my-workouts": "Get your workout history",
             "GET /progress-analytics": "Get progress analytics",
+            "GET /progress-trends": "Get streaks, moving averages and 4/12-week trends",
             "GET /workout-details/{id}": "Get detailed workout info"
         }
     }
\ No newline at end of file
@@ -1,17 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import logging
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.models import User, UserProfile
-from app.ml.workout_generator import workout_generator
+from app.ml.workout_generator import DEFAULT_PROGRAM_WEEKS, program_seed, program_week, workout_generator
+from app.plans import get_next_plan, profile_data
+from app.profiles import get_profile
+from app.responses import StaticJSON
+from app.routers.auth import AuthenticatedUser, get_current_user
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MAX_PROGRAM_WEEKS = 52
+PROGRAM_PAGE_WEEKS = 4
+
 @router.post("/generate-workout")
-async def generate_workout(db: Session = Depends(get_db)):
-    """Generate personalized workout using ML"""
-    
-    # For testing, get the first user profile available
-    user_profile = db.query(UserProfile).first()
+async def generate_workout(
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Serve the caller's next workout, precomputed in the background when possible"""
+    user_profile = await get_profile(db, current_user.id)
     
     if not user_profile:
         raise HTTPException(
@@ -19,22 +30,9 @@ async def generate_workout(db: Session = Depends(get_db)):
             detail="Please complete your fitness profile first"
         )
     
-    # Convert profile to dict for ML model
-    profile_data = {
-        "age": user_profile.age,
-        "weight": user_profile.weight,
-        "height": user_profile.height,
-        "gender": user_profile.gender,
-        "fitness_level": user_profile.fitness_level,
-        "goals": user_profile.goals,
-        "workout_days": user_profile.workout_days,
-        "workout_duration": user_profile.workout_duration,
-        "injuries": user_profile.injuries,
-        "equipment": user_profile.equipment
-    }
-    
-    # Generate personalized workout using ML
-    workout_plan = workout_generator.generate_workout_plan(profile_data)
+    # Usually a stored row; built inline only on a cold miss
+    workout_plan, precomputed = await get_next_plan(db, current_user.id, user_profile, datetime.utcnow().date())
+    logger.debug("Next plan for user %s (%s)", current_user.id, "precomputed" if precomputed else "cold miss")
     
     return {
         "workout": workout_plan,
@@ -42,38 +40,77 @@ async def generate_workout(db: Session = Depends(get_db)):
         "advantages": ["Fast generation", "Always available", "Consistent results"]
     }
 
+@router.get("/workout-program")
+async def get_workout_program(
+    weeks: int = Query(DEFAULT_PROGRAM_WEEKS, ge=1, le=MAX_PROGRAM_WEEKS),
+    start: int = Query(1, ge=1, description="First week of the page (1-based)"),
+    limit: int = Query(PROGRAM_PAGE_WEEKS, ge=1, le=MAX_PROGRAM_WEEKS),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Page through a periodized multi-week program; only the requested weeks are built"""
+    user_profile = await get_profile(db, current_user.id)
+    if not user_profile:
+        raise HTTPException(status_code=400, detail="Please complete your fitness profile first")
+
+    # A program starts when the profile is saved (any edit changes the exercise
+    # pool anyway), so its weeks stay the same for as long as the user follows it
+    started = user_profile.updated_at or user_profile.created_at
+    program = workout_generator.generate_program(
+        profile_data(user_profile), weeks=weeks, seed=program_seed(current_user.id, started)
+    )
+    page = list(program.iter_weeks(start, limit))
+    return {
+        "program": program.header,
+        "started_at": started.isoformat() if started else None,
+        "current_week": min(program_week(started, datetime.utcnow().date()), len(program)),
+        "weeks": page,
+        "next_week": start + limit if start + limit <= len(program) else None
+    }
+
+# Constant payloads, encoded once at import and served with ETag/Cache-Control
+BASIC_PLAN = StaticJSON({
+    "plan_name": "Basic Full Body Workout",
+    "fitness_level": "beginner",
+    "goal": "general_fitness",
+    "duration": 30,
+    "days_per_week": 3,
+    "exercises": [
+        "Bodyweight Squats", "Push-ups", "Plank", "Jumping Jacks",
+        "Lunges", "Glute Bridges", "Mountain Climbers"
+    ],
+    "workout_structure": [
+        {"exercise": "Bodyweight Squats", "sets": 3, "reps": "12-15", "rest": "30s"},
+        {"exercise": "Push-ups", "sets": 3, "reps": "8-12", "rest": "30s"},
+        {"exercise": "Plank", "sets": 3, "reps": "30-45s", "rest": "30s"},
+        {"exercise": "Jumping Jacks", "sets": 3, "reps": "30-45s", "rest": "30s"}
+    ]
+})
+
+WORKOUT_PLANS = StaticJSON({
+    "plans": [
+        {"id": 1, "name": "Beginner Weight Loss", "level": "beginner", "goal": "weight_loss"},
+        {"id": 2, "name": "Intermediate Muscle Gain", "level": "intermediate", "goal": "muscle_gain"},
+        {"id": 3, "name": "Advanced Endurance", "level": "advanced", "goal": "endurance"}
+    ]
+})
+
+# GET lets browsers and proxies cache it
+@router.get("/generate-basic")
+async def generate_basic_workout(request: Request):
+    """Generate basic workout (fallback option)"""
+    return BASIC_PLAN.response(request)
+
+# POST is kept for older clients; POST responses are not cacheable, so no validators
 @router.post("/generate-basic")
-async def generate_basic_workout():
+async def generate_basic_workout_post():
     """Generate basic workout (fallback option)"""
-    basic_plan = {
-        "plan_name": "Basic Full Body Workout",
-        "fitness_level": "beginner",
-        "goal": "general_fitness",
-        "duration": 30,
-        "days_per_week": 3,
-        "exercises": [
-            "Bodyweight Squats", "Push-ups", "Plank", "Jumping Jacks",
-            "Lunges", "Glute Bridges", "Mountain Climbers"
-        ],
-        "workout_structure": [
-            {"exercise": "Bodyweight Squats", "sets": 3, "reps": "12-15", "rest": "30s"},
-            {"exercise": "Push-ups", "sets": 3, "reps": "8-12", "rest": "30s"},
-            {"exercise": "Plank", "sets": 3, "reps": "30-45s", "rest": "30s"},
-            {"exercise": "Jumping Jacks", "sets": 3, "reps": "30-45s", "rest": "30s"}
-        ]
-    }
-    return basic_plan
+    return BASIC_PLAN.uncached_response()
 
 @router.get("/plans")
-async def get_workout_plans():
+async def get_workout_plans(request: Request):
     """Get available workout plans"""
-    return {
-        "plans": [
-            {"id": 1, "name": "Beginner Weight Loss", "level": "beginner", "goal": "weight_loss"},
-            {"id": 2, "name": "Intermediate Muscle Gain", "level": "intermediate", "goal": "muscle_gain"},
-            {"id": 3, "name": "Advanced Endurance", "level": "advanced", "goal": "endurance"}
-        ]
-    }
+    return WORKOUT_PLANS.response(request)
 
 @router.get("/test")
 async def test_workouts():
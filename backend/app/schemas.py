@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 # User schemas
@@ -26,6 +26,10 @@ class Token(BaseModel):
     token_type: str
     user_id: int
     email: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 # Workout schemas
 class WorkoutBase(BaseModel):
@@ -60,3 +64,33 @@ class Progress(ProgressBase):
 
     class Config:
         from_attributes = True
+
+# Workout history response schemas. The routes return FastJSONResponse
+# directly, so these are declared with responses= for the OpenAPI docs only;
+# as a response_model they would look like validation that never happens.
+class WorkoutHistoryPage(BaseModel):
+    total_workouts: int
+    workouts: List[Dict[str, Any]]  # the fields selected with ?fields=
+    next_cursor: Optional[str] = None
+    message: Optional[str] = None
+
+class WorkoutSummary(BaseModel):
+    id: int
+    workout_name: Optional[str] = None
+    workout_type: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    difficulty_rating: Optional[int] = None
+    energy_level: Optional[int] = None
+    personal_notes: Optional[str] = None
+    created_at: Optional[str] = None
+
+class WorkoutFeedbackText(BaseModel):
+    feedback_text: Optional[str] = None
+    rating: Optional[int] = None
+
+class WorkoutDetails(BaseModel):
+    workout_details: WorkoutSummary
+    workout_plan: Optional[Dict[str, Any]] = None
+    completion_data: Optional[Dict[str, Any]] = None
+    exercises_logged: Optional[List[Any]] = None
+    ai_feedback: WorkoutFeedbackText
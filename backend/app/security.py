@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from app import config
+from app.throttle import InflightLimiter
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+class HasherSaturated(Exception):
+    """Raised when the password hashing queue is full"""
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated thread pool so hashing never blocks the event loop.
+
+    It is also the single admission point for hashing: at most max_pending
+    operations run or queue at once, and the rest fail fast with HasherSaturated.
+    """
+
+    def __init__(self, max_workers: int = config.PASSWORD_HASH_WORKERS,
+                 max_pending: int = config.PASSWORD_HASH_MAX_PENDING):
+        # max_workers=0 hashes inline on the event loop (the old behaviour, kept for benchmarks)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pwhash") if max_workers > 0 else None
+        self._admission = InflightLimiter(max_pending)
+
+    @property
+    def pending(self) -> int:
+        return self._admission.inflight
+
+    @property
+    def rejected(self) -> int:
+        return self._admission.rejected
+
+    async def _run(self, fn, *args):
+        if not self._admission.try_acquire():
+            raise HasherSaturated()
+        try:
+            if self._executor is None:
+                return fn(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._admission.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(pwd_context.verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+# Global instance
+password_hasher = PasswordHasher()
@@ -0,0 +1,178 @@
+"""Per-user workout stats rollup (user_workout_stats).
+
+The rollup is updated in the same transaction that logs a workout, so
+/progress-analytics reads one row instead of the whole history. To rebuild it
+from workout_feedback, e.g. after editing rows by hand:
+
+    python -m app.stats [--user-id N]
+"""
+import argparse
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.models import UserWorkoutStats, WorkoutFeedback
+
+logger = logging.getLogger(__name__)
+
+WEEK_DAYS = 7
+WEEKLY_TARGET = 3  # workouts per week for a 100% consistency score
+
+# Fallbacks for unset columns, matching the defaults workouts are logged with
+DEFAULT_RATING = 3
+DEFAULT_DURATION = 30
+DEFAULT_DIFFICULTY = 3
+DEFAULT_WORKOUT_TYPE = "ml_generated"
+
+RECENT_SESSIONS = 3  # logged sessions the generator steers away from repeating
+
+def new_stats(user_id: int) -> UserWorkoutStats:
+    return UserWorkoutStats(
+        user_id=user_id, total_workouts=0, rating_sum=0, duration_sum=0, difficulty_sum=0,
+        current_streak=0, daily_counts={}, workout_type_counts={}, recent_exercises=None
+    )
+
+def recent_sessions(ring: Optional[Dict[str, Any]]) -> List[List[str]]:
+    """Exercise names of the sessions in a recent_exercises ring, oldest first"""
+    if not ring:
+        return []
+    slots, head = ring["slots"], ring["head"]
+    return [session for session in slots[head:] + slots[:head] if session is not None]
+
+def push_recent_exercises(ring: Optional[Dict[str, Any]], exercises: List[str]) -> Dict[str, Any]:
+    """A copy of the ring with `exercises` written over its oldest slot.
+
+    The ring is {"head": next slot to write, "slots": RECENT_SESSIONS entries,
+    None until filled}; a ring of another size is laid out afresh.
+    """
+    if ring is None or len(ring["slots"]) != RECENT_SESSIONS:
+        sessions = recent_sessions(ring)[-RECENT_SESSIONS:]
+        ring = {
+            "head": len(sessions) % RECENT_SESSIONS,
+            "slots": sessions + [None] * (RECENT_SESSIONS - len(sessions)),
+        }
+    slots = list(ring["slots"])
+    slots[ring["head"]] = exercises
+    return {"head": (ring["head"] + 1) % RECENT_SESSIONS, "slots": slots}
+
+def _plan_exercises(workout_plan) -> List[str]:
+    exercises = workout_plan.get("exercises") if isinstance(workout_plan, dict) else None
+    return [name for name in exercises if isinstance(name, str)] if isinstance(exercises, list) else []
+
+def record_workout(stats: UserWorkoutStats, workout, logged_at: datetime):
+    """Fold one workout (ORM row or Row with the same attributes) into the rollup"""
+    day = logged_at.date()
+    stats.total_workouts += 1
+    stats.rating_sum += workout.rating or DEFAULT_RATING
+    stats.duration_sum += workout.duration_minutes or DEFAULT_DURATION
+    stats.difficulty_sum += workout.difficulty_rating or DEFAULT_DIFFICULTY
+
+    if stats.last_workout_date is None or day > stats.last_workout_date:
+        consecutive = stats.last_workout_date is not None and (day - stats.last_workout_date).days == 1
+        stats.current_streak = stats.current_streak + 1 if consecutive else 1
+        stats.last_workout_date = day
+
+    # JSON columns are reassigned rather than mutated so the change is flushed
+    cutoff = day - timedelta(days=WEEK_DAYS)
+    daily_counts = {
+        key: count for key, count in (stats.daily_counts or {}).items()
+        if date.fromisoformat(key) > cutoff
+    }
+    daily_counts[day.isoformat()] = daily_counts.get(day.isoformat(), 0) + 1
+    stats.daily_counts = daily_counts
+
+    workout_type = workout.workout_type or DEFAULT_WORKOUT_TYPE
+    type_counts = dict(stats.workout_type_counts or {})
+    type_counts[workout_type] = type_counts.get(workout_type, 0) + 1
+    stats.workout_type_counts = type_counts
+
+    stats.recent_exercises = push_recent_exercises(stats.recent_exercises, _plan_exercises(workout.workout_plan))
+
+async def apply_workout(db, workout: WorkoutFeedback, logged_at: datetime) -> UserWorkoutStats:
+    """Update the user's rollup for a newly added workout, inside the caller's transaction.
+
+    Call after the workout row is flushed: on SQLite that insert already holds the
+    write lock, elsewhere FOR UPDATE serializes concurrent logs for the same user.
+    populate_existing makes the locked read overwrite a copy of the row the
+    session already holds (e.g. loaded for feedback), which may be stale.
+    """
+    stats = await db.scalar(
+        select(UserWorkoutStats)
+        .where(UserWorkoutStats.user_id == workout.user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    if stats is None:
+        stats = new_stats(workout.user_id)
+        db.add(stats)
+    record_workout(stats, workout, logged_at)
+    return stats
+
+def summarize_stats(stats: Optional[UserWorkoutStats], today: date) -> Optional[Dict[str, Any]]:
+    """Analytics figures as of `today`, or None when nothing has been logged"""
+    if stats is None or not stats.total_workouts:
+        return None
+
+    week_start = today - timedelta(days=WEEK_DAYS)
+    weekly_workouts = sum(
+        count for key, count in (stats.daily_counts or {}).items()
+        if week_start < date.fromisoformat(key) <= today
+    )
+    type_counts = stats.workout_type_counts or {}
+    total = stats.total_workouts
+    return {
+        "total_workouts": total,
+        "average_rating": stats.rating_sum / total,
+        "average_duration": stats.duration_sum / total,
+        "average_difficulty": stats.difficulty_sum / total,
+        # A streak only counts while it reaches today
+        "current_streak": stats.current_streak if stats.last_workout_date == today else 0,
+        "weekly_workouts": weekly_workouts,
+        "consistency_score": min(100, (weekly_workouts / WEEKLY_TARGET) * 100),
+        "most_common_workout_type": max(type_counts, key=type_counts.get) if type_counts else "None",
+    }
+
+def rebuild_stats(session: Session, user_id: Optional[int] = None) -> int:
+    """Recompute rollups from workout_feedback in the session's transaction; returns users rebuilt"""
+    statement = (
+        select(
+            WorkoutFeedback.user_id, WorkoutFeedback.rating, WorkoutFeedback.duration_minutes,
+            WorkoutFeedback.difficulty_rating, WorkoutFeedback.workout_type, WorkoutFeedback.workout_plan,
+            WorkoutFeedback.created_at
+        )
+        .where(WorkoutFeedback.user_id.is_not(None), WorkoutFeedback.created_at.is_not(None))
+        .order_by(WorkoutFeedback.user_id, WorkoutFeedback.created_at, WorkoutFeedback.id)
+    )
+    clear = delete(UserWorkoutStats)
+    if user_id is not None:
+        statement = statement.where(WorkoutFeedback.user_id == user_id)
+        clear = clear.where(UserWorkoutStats.user_id == user_id)
+
+    session.execute(clear)
+    rollups: Dict[int, UserWorkoutStats] = {}
+    for row in session.execute(statement.execution_options(yield_per=1000)):
+        stats = rollups.get(row.user_id)
+        if stats is None:
+            stats = rollups[row.user_id] = new_stats(row.user_id)
+        record_workout(stats, row, row.created_at)
+    session.add_all(rollups.values())
+    session.flush()
+    logger.info("Rebuilt workout stats for %d users", len(rollups))
+    return len(rollups)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild user_workout_stats from workout_feedback")
+    parser.add_argument("--user-id", type=int, help="only rebuild this user's rollup")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal, engine
+    from app.migrations import run_migrations
+
+    run_migrations(engine)
+    with SessionLocal() as session, session.begin():
+        users = rebuild_stats(session, args.user_id)
+    print(f"Rebuilt workout stats for {users} user(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+class TokenBucketLimiter:
+    """Per-key token buckets held in a bounded LRU map of (tokens, timestamp) pairs"""
+
+    def __init__(self, rate_per_minute: float, burst: float, max_keys: int = 50000):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take cost tokens from key's bucket; returns (allowed, seconds until allowed)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+                retry_after = 0.0
+            else:
+                self.rejected += 1
+                retry_after = (cost - tokens) / self.rate if self.rate > 0 else float("inf")
+
+            # Re-insert at the MRU end; the oldest idle buckets are evicted first
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return allowed, retry_after
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class InflightLimiter:
+    """Global cap on concurrent operations; callers shed load when it is full"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._inflight >= self.limit:
+                self.rejected += 1
+                return False
+            self._inflight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._inflight -= 1
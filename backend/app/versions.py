@@ -0,0 +1,27 @@
+"""Per-user data versions for conditional GETs.
+
+users.data_version goes up by one, in the writing transaction, whenever the
+user's profile or workout history changes. The polled read endpoints send it
+as a weak ETag and answer a matching If-None-Match with 304 after a single
+primary-key read, before the queries that build the full response.
+"""
+from typing import Optional
+from sqlalchemy import select, update
+from app.models import User
+
+async def bump_data_version(db, user_id: int):
+    """Invalidate the user's ETags; call inside the transaction that changes their data"""
+    await db.execute(update(User).where(User.id == user_id).values(data_version=User.data_version + 1))
+
+async def data_version(db, user_id: int) -> int:
+    return await db.scalar(select(User.data_version).where(User.id == user_id)) or 0
+
+async def user_etag(db, user_id: int, scope: str, qualifier: Optional[str] = None) -> str:
+    """Weak ETag for one endpoint's view of the user's data.
+
+    qualifier covers anything else the representation depends on, e.g. the
+    date for figures computed relative to today.
+    """
+    version = await data_version(db, user_id)
+    tag = f"{scope}-{user_id}-{version}" if qualifier is None else f"{scope}-{user_id}-{version}-{qualifier}"
+    return f'W/"{tag}"'
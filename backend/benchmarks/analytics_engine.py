@@ -0,0 +1,96 @@
+"""Per-row Python analytics vs the vectorized engine in app/analytics.py.
+
+The row-loop baseline follows the old router code: sort the history, walk it
+for the streak, filter by date for the weekly count and average one attribute
+at a time. The vectorized side starts from the numeric rows the series query
+returns and includes building the arrays. Expect the engine to lose below
+about 1,000 rows, where its fixed per-call NumPy cost dominates.
+
+    python benchmarks/analytics_engine.py [--rows 1000,10000,100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analytics import WorkoutSeries, progress_trends  # noqa: E402
+
+class Row:
+    __slots__ = ("created_at", "rating", "duration_minutes", "difficulty_rating", "completion_data")
+
+    def __init__(self, created_at, rating, duration, difficulty, completed, total):
+        self.created_at = created_at
+        self.rating = rating
+        self.duration_minutes = duration
+        self.difficulty_rating = difficulty
+        self.completion_data = {"completed_exercises": completed, "total_exercises": total}
+
+def synthetic_history(count: int, now: datetime):
+    rng = random.Random(count)
+    rows = []
+    for i in range(count):
+        created_at = now - timedelta(hours=i * 9 + rng.randrange(6))
+        rows.append((i, created_at, rng.randint(1, 5), rng.choice((20, 30, 45)),
+                     rng.randint(1, 5), rng.randint(0, 6), 6))
+    return rows
+
+def row_loop(rows, now: datetime):
+    """Baseline: the per-row Python the routers used to run over ORM objects"""
+    workouts = [Row(*row[1:]) for row in rows]
+    total = len(workouts)
+    average_rating = sum(w.rating for w in workouts) / total
+    average_duration = sum(w.duration_minutes for w in workouts) / total
+    average_difficulty = sum(w.difficulty_rating for w in workouts) / total
+    completion = [w.completion_data.get("completed_exercises", 0) / w.completion_data.get("total_exercises", 1) * 100
+                  for w in workouts]
+    average_completion = sum(completion) / total
+
+    streak = 0
+    current_date = now.date()
+    for workout in sorted(workouts, key=lambda x: x.created_at, reverse=True):
+        days_diff = (current_date - workout.created_at.date()).days
+        if days_diff == streak:
+            streak += 1
+        elif days_diff > streak:
+            break
+
+    week_ago = now - timedelta(days=7)
+    weekly = len([w for w in workouts if w.created_at >= week_ago])
+    return average_rating, average_duration, average_difficulty, average_completion, streak, weekly
+
+def as_series_rows(rows):
+    """The same history as queries.workout_series() returns it, timestamps in epoch seconds"""
+    return [(row[0], row[1].replace(tzinfo=timezone.utc).timestamp(), *row[2:]) for row in rows]
+
+def vectorized(rows, now: datetime):
+    return progress_trends(WorkoutSeries.from_rows(rows), now.date())
+
+def best_of(func, rows, now, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows, now)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="1000,10000,100000", help="comma-separated history sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="best-of runs per size")
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    for size in (int(value) for value in args.rows.split(",")):
+        # (id, created_at, rating, duration, difficulty, completed, total)
+        rows = synthetic_history(size, now)
+        loop_ms = best_of(row_loop, rows, now, args.repeat)
+        vector_ms = best_of(vectorized, as_series_rows(rows), now, args.repeat)
+        print(f"rows={size:>7}: row loop {loop_ms:9.2f}ms | vectorized {vector_ms:8.2f}ms "
+              f"(incl. 4/12-week trends) | {loop_ms / vector_ms:5.1f}x")
+
+if __name__ == "__main__":
+    main()
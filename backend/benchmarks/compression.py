@@ -0,0 +1,72 @@
+"""Compression ratio and CPU cost of gzip levels and brotli qualities on history pages.
+
+Encodes /api/my-workouts pages with the full plan and log blobs (the same
+synthetic history as benchmarks/serialization.py) and compresses each body
+the way CompressionMiddleware does: in chunks, flushing after each one.
+
+    python benchmarks/compression.py [--sizes 20,100,1000] [--repeat 10]
+"""
+import argparse
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.responses import FastJSONResponse  # noqa: E402
+from serialization import history_page  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CHUNK = 64 * 1024
+GZIP_LEVELS = (1, 4, 5, 6, 9)
+BROTLI_QUALITIES = (1, 4, 5, 6)
+
+def gzip_stream(body: bytes, level: int) -> int:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    size = 0
+    for start in range(0, len(body), CHUNK):
+        size += len(compressor.compress(body[start:start + CHUNK]) + compressor.flush(zlib.Z_SYNC_FLUSH))
+    return size + len(compressor.flush())
+
+def brotli_stream(body: bytes, quality: int) -> int:
+    compressor = brotli.Compressor(quality=quality)
+    size = 0
+    for start in range(0, len(body), CHUNK):
+        size += len(compressor.process(body[start:start + CHUNK]) + compressor.flush())
+    return size + len(compressor.finish())
+
+def best_of(func, body, setting, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = func(body, setting)
+        best = min(best, time.perf_counter() - start)
+    return size, best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="20,100,1000", help="comma-separated workouts per response")
+    parser.add_argument("--repeat", type=int, default=10, help="best-of runs per setting")
+    args = parser.parse_args()
+
+    codecs = [("gzip", gzip_stream, GZIP_LEVELS)]
+    if brotli is not None:
+        codecs.append(("br", brotli_stream, BROTLI_QUALITIES))
+    else:
+        print("brotli not installed; gzip only")
+    for workouts in (int(value) for value in args.sizes.split(",")):
+        body = FastJSONResponse(history_page(workouts)).body
+        print(f"workouts={workouts} ({len(body) / 1024:.1f} KiB)")
+        for name, func, settings in codecs:
+            for setting in settings:
+                size, ms = best_of(func, body, setting, args.repeat)
+                print(f"  {name:>4} {setting:>2}: {size / 1024:8.1f} KiB ({len(body) / size:5.1f}x smaller) "
+                      f"{ms:8.2f}ms  {len(body) / 1024 / 1024 / (ms / 1000):7.1f} MiB/s")
+
+if __name__ == "__main__":
+    main()
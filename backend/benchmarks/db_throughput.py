@@ -0,0 +1,108 @@
+"""Authenticated read throughput under concurrent load, sync vs async sessions.
+
+Seeds one user with a workout history, then runs concurrent clients against
+/api/my-workouts and /api/progress-analytics. Each DB_MODE runs in a fresh
+interpreter with its own database file.
+
+    python benchmarks/db_throughput.py [--clients 32] [--duration 5] [--history 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUTES = ("/api/my-workouts", "/api/progress-analytics")
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def seed(history: int) -> str:
+    from datetime import datetime, timedelta
+    from app import models
+    from app.database import SessionLocal
+    from app.routers.auth import create_access_token
+    from app.stats import rebuild_stats
+
+    db = SessionLocal()
+    user = models.User(email="bench@example.com", username="bench", password_hash="x")
+    db.add(user)
+    db.commit()
+    now = datetime.utcnow()
+    db.add_all([
+        models.WorkoutFeedback(
+            user_id=user.id,
+            workout_plan={"exercises": ["Push-ups", "Squats", "Plank"]},
+            completion_data={"completed_exercises": 3, "total_exercises": 3},
+            duration_minutes=30, difficulty_rating=3, energy_level=3, rating=4,
+            exercises_logged=[], feedback_text="Nice work", workout_type="ml_generated",
+            created_at=now - timedelta(hours=12 * i),
+        )
+        for i in range(history)
+    ])
+    db.flush()
+    rebuild_stats(db, user.id)
+    db.commit()
+    db.close()
+    return create_access_token({"sub": "bench@example.com"})
+
+async def load(clients: int, duration: float, history: int):
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        headers = {"Authorization": f"Bearer {seed(history)}"}
+        latencies = []
+        deadline = time.perf_counter() + duration
+
+        async def worker(index: int):
+            route = ROUTES[index % len(ROUTES)]
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(route, headers=headers)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, elapsed
+
+def run_mode(args):
+    os.chdir(tempfile.mkdtemp())
+    sys.path.insert(0, BACKEND_DIR)
+    latencies, elapsed = asyncio.run(load(args.clients, args.duration, args.history))
+    print(f"{os.environ['DB_MODE']:>6}: {len(latencies) / elapsed:8.1f} req/s "
+          f"p50={statistics.median(latencies):7.2f}ms p99={percentile(latencies, 99):7.2f}ms "
+          f"(n={len(latencies)})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode")
+    parser.add_argument("--history", type=int, default=200, help="workouts seeded for the user")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args)
+        return
+
+    for mode in ("sync", "async"):
+        env = dict(os.environ, DB_MODE=mode, LOG_LEVEL="WARNING")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child",
+                        "--clients", str(args.clients), "--duration", str(args.duration),
+                        "--history", str(args.history)],
+                       env=env, check=True)
+
+if __name__ == "__main__":
+    main()
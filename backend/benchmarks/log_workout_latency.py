@@ -0,0 +1,102 @@
+"""/api/log-workout latency as the user's history grows.
+
+Feedback generation reads a bounded slice of recent rows plus the stats rollup,
+so latency should stay flat across history sizes. Each size runs in a fresh
+interpreter with its own database file.
+
+    python benchmarks/log_workout_latency.py [--sizes 10,1000,20000] [--requests 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def seed(history: int) -> str:
+    from datetime import datetime, timedelta
+    from app import models
+    from app.database import SessionLocal
+    from app.routers.auth import create_access_token
+    from app.stats import rebuild_stats
+
+    db = SessionLocal()
+    user = models.User(email="bench@example.com", username="bench", password_hash="x")
+    db.add(user)
+    db.flush()
+    db.add(models.UserProfile(user_id=user.id, fitness_level="intermediate", goals="general_fitness",
+                              equipment="home", workout_days=3, workout_duration=30))
+    now = datetime.utcnow()
+    db.add_all([
+        models.WorkoutFeedback(
+            user_id=user.id,
+            workout_plan={"exercises": ["Push-ups", "Squats", "Plank"]},
+            completion_data={"completed_exercises": 3, "total_exercises": 3},
+            duration_minutes=30, difficulty_rating=3, energy_level=3, rating=4,
+            exercises_logged=[], feedback_text="Nice work", workout_type="ml_generated",
+            created_at=now - timedelta(hours=6 * i),
+        )
+        for i in range(history)
+    ])
+    db.flush()
+    rebuild_stats(db, user.id)
+    db.commit()
+    db.close()
+    return create_access_token({"sub": "bench@example.com"})
+
+async def load(history: int, requests: int):
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        headers = {"Authorization": f"Bearer {seed(history)}"}
+        body = {
+            "workout_plan": {"exercises": ["Push-ups", "Squats", "Plank"]},
+            "completion_data": {"completed_exercises": 2, "total_exercises": 3},
+        }
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.post("/api/log-workout", json=body, headers=headers)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def run_size(args):
+    os.chdir(tempfile.mkdtemp())
+    sys.path.insert(0, BACKEND_DIR)
+    latencies = asyncio.run(load(args.history, args.requests))
+    print(f"history={args.history:>7}: p50={statistics.median(latencies):7.2f}ms "
+          f"p99={percentile(latencies, 99):7.2f}ms (n={len(latencies)})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,1000,20000", help="comma-separated history sizes")
+    parser.add_argument("--requests", type=int, default=200, help="workouts logged per size")
+    parser.add_argument("--history", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_size(args)
+        return
+
+    for size in args.sizes.split(","):
+        env = dict(os.environ, LOG_LEVEL="WARNING")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child",
+                        "--history", size.strip(), "--requests", str(args.requests)],
+                       env=env, check=True)
+
+if __name__ == "__main__":
+    main()
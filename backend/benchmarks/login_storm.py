@@ -0,0 +1,93 @@
+"""p99 latency of /health while a burst of logins hits /api/auth/login.
+
+Runs the storm twice in fresh interpreters: once hashing inline on the event
+loop (PASSWORD_HASH_WORKERS=0, the old behaviour) and once on the hashing pool.
+
+    python benchmarks/login_storm.py [--logins 16] [--duration 3]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEALTH_INTERVAL = 0.01
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def storm(logins: int, duration: float):
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await client.post("/api/auth/register", json={
+            "email": "storm@example.com", "username": "storm", "password": "correct-horse"
+        })
+
+        health_latencies = []
+        login_statuses = []
+        deadline = time.perf_counter() + duration
+
+        async def poll_health():
+            # Latency is measured from the scheduled send time, so time spent
+            # waiting for a blocked event loop is counted too
+            scheduled = time.perf_counter()
+            while scheduled < deadline:
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/health")
+                health_latencies.append((time.perf_counter() - scheduled) * 1000)
+                scheduled += HEALTH_INTERVAL
+
+        async def login_loop():
+            while time.perf_counter() < deadline:
+                response = await client.post("/api/auth/login", data={
+                    "username": "storm@example.com", "password": "correct-horse"
+                })
+                login_statuses.append(response.status_code)
+
+        await asyncio.gather(poll_health(), *(login_loop() for _ in range(logins)))
+
+    return health_latencies, login_statuses
+
+def run_mode(args):
+    os.chdir(tempfile.mkdtemp())
+    sys.path.insert(0, BACKEND_DIR)
+    latencies, statuses = asyncio.run(storm(args.logins, args.duration))
+    workers = os.environ.get("PASSWORD_HASH_WORKERS")
+    label = "inline (before)" if workers == "0" else f"pool of {workers} (after)"
+    print(f"{label:>22}: /health n={len(latencies):5d} "
+          f"p50={statistics.median(latencies):8.2f}ms p99={percentile(latencies, 99):8.2f}ms "
+          f"max={max(latencies):8.2f}ms | logins ok={statuses.count(200)} "
+          f"shed={sum(1 for s in statuses if s in (429, 503))}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=16, help="concurrent login loops")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per mode")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args)
+        return
+
+    for workers in ("0", str(os.cpu_count() or 1)):
+        # Keep per-request logging out of the timings, and lift the per-IP/email
+        # login buckets so every attempt reaches the hashing path
+        env = dict(os.environ, PASSWORD_HASH_WORKERS=workers, LOG_LEVEL="WARNING",
+                   LOGIN_IP_BURST="1e9", LOGIN_EMAIL_BURST="1e9")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child",
+                        "--logins", str(args.logins), "--duration", str(args.duration)],
+                       env=env, check=True)
+
+if __name__ == "__main__":
+    main()
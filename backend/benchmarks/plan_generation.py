@@ -0,0 +1,67 @@
+"""Weekly bulk regeneration: a loop over generate_workout_plan vs generate_workout_plans.
+
+Both sides start from the same list of profile dicts and produce one plan per
+profile; the batch side includes extracting the numeric columns from the dicts.
+
+    python benchmarks/plan_generation.py [--profiles 1000000] [--repeat 1]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.workout_generator import WorkoutGenerator  # noqa: E402
+
+LEVELS = ("beginner", "intermediate", "advanced")
+GOALS = ("weight_loss", "muscle_gain", "endurance")
+
+def synthetic_profiles(count: int):
+    rng = random.Random(count)
+    return [
+        {
+            "age": rng.randint(18, 70),
+            "weight": rng.uniform(45, 130),
+            "height": rng.uniform(150, 200),
+            "gender": rng.choice(("male", "female", "other")),
+            "fitness_level": rng.choice(LEVELS),
+            "goals": rng.choice(GOALS),
+            "workout_days": rng.randint(2, 6),
+            "workout_duration": rng.choice((15, 20, 30, 45, 60)),
+            "equipment": rng.choice(("home", "basic", "gym", "mixed")),
+            "injuries": rng.choice(("", "", "", "bad knee", "lower back pain", "wrist strain")),
+        }
+        for _ in range(count)
+    ]
+
+def single_loop(generator, profiles):
+    return [generator.generate_workout_plan(profile) for profile in profiles]
+
+def batch(generator, profiles):
+    return generator.generate_workout_plans(profiles)
+
+def best_of(func, generator, profiles, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(generator, profiles)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=1_000_000, help="number of profiles to regenerate")
+    parser.add_argument("--repeat", type=int, default=1, help="best-of runs per side")
+    args = parser.parse_args()
+
+    generator = WorkoutGenerator()
+    profiles = synthetic_profiles(args.profiles)
+    loop_s = best_of(single_loop, generator, profiles, args.repeat)
+    batch_s = best_of(batch, generator, profiles, args.repeat)
+    print(f"profiles={args.profiles}: single-profile loop {loop_s:7.2f}s ({args.profiles / loop_s:9.0f}/s) | "
+          f"batch {batch_s:7.2f}s ({args.profiles / batch_s:9.0f}/s) | {loop_s / batch_s:4.1f}x")
+
+if __name__ == "__main__":
+    main()
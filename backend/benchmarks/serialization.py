@@ -0,0 +1,94 @@
+"""Response encoding for /api/my-workouts pages with the plan and log blobs included.
+
+Compares FastAPI's default path for a returned dict (jsonable_encoder, then
+JSONResponse's json.dumps) with FastJSONResponse rendering the dict directly,
+and with Pydantic's Rust serializer for the WorkoutHistoryPage response model.
+Each item carries a generated 8-exercise plan and a per-set exercise log.
+
+    python benchmarks/serialization.py [--sizes 20,100,1000] [--repeat 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from app import schemas  # noqa: E402
+from app.ml.workout_generator import WorkoutGenerator  # noqa: E402
+from app.responses import FastJSONResponse, orjson  # noqa: E402
+
+def history_page(size: int):
+    rng = random.Random(size)
+    generator = WorkoutGenerator()
+    profile = {"weight": 80, "height": 180, "fitness_level": "intermediate", "goals": "muscle_gain",
+               "workout_duration": 60, "workout_days": 4}
+    now = datetime(2026, 10, 16)
+    workouts = []
+    for i in range(size):
+        plan = generator.generate_workout_plan(profile, seed=i)
+        logged = [
+            {"exercise": name, "set": s + 1, "reps": rng.randint(6, 15), "weight_kg": round(rng.uniform(0, 60), 1),
+             "completed": rng.random() > 0.1}
+            for name in plan["exercises"] for s in range(3)
+        ]
+        workouts.append({
+            "id": size - i,
+            "workout_name": "Workout Session",
+            "workout_type": "ml_generated",
+            "duration_minutes": 60,
+            "difficulty_rating": rng.randint(1, 5),
+            "energy_level": rng.randint(1, 5),
+            "completion_rate": round(rng.uniform(40, 100), 1),
+            "exercise_count": len(plan["exercises"]),
+            "rating": rng.randint(3, 5),
+            "personal_notes": "Felt strong today, increase load next week",
+            "created_at": (now - timedelta(days=i)).isoformat(),
+            "feedback_text": "Excellent work! You completed most of your workout. Keep up the great consistency!",
+            "workout_plan": plan,
+            "exercises_logged": logged,
+        })
+    return {"total_workouts": size, "workouts": workouts, "next_cursor": "MjAyNi0xMC0xNlQwMDowMDowMHwx"}
+
+def best_of(func, content, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def default_path(content):
+    return JSONResponse(jsonable_encoder(content)).body
+
+def fast_path(content):
+    return FastJSONResponse(content).body
+
+model_adapter = TypeAdapter(schemas.WorkoutHistoryPage)
+
+def model_path(content):
+    return model_adapter.dump_json(model_adapter.validate_python(content))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="20,100,1000", help="comma-separated workouts per response")
+    parser.add_argument("--repeat", type=int, default=50, help="best-of runs per path")
+    args = parser.parse_args()
+
+    print(f"FastJSONResponse encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib json (orjson not installed)'}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        content = history_page(size)
+        default_ms = best_of(default_path, content, args.repeat)
+        fast_ms = best_of(fast_path, content, args.repeat)
+        model_ms = best_of(model_path, content, args.repeat)
+        print(f"workouts={size:>5} ({len(fast_path(content)) / 1024:7.1f} KiB): "
+              f"jsonable_encoder+json {default_ms:8.2f}ms | FastJSONResponse {fast_ms:7.2f}ms "
+              f"({default_ms / fast_ms:5.1f}x) | response model {model_ms:7.2f}ms ({default_ms / model_ms:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
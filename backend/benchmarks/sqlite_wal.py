@@ -0,0 +1,113 @@
+"""History-read throughput while workouts are being logged concurrently.
+
+Compares SQLite's defaults (rollback journal, synchronous=FULL, small cache,
+no mmap) against the tuned storage profile in app/database.py. Each profile
+runs in a fresh interpreter against its own database file.
+
+    python benchmarks/sqlite_wal.py [--readers 4] [--writers 2] [--duration 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "default (before)": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_CACHE_SIZE_KB": "2000",
+        "SQLITE_MMAP_SIZE": "0",
+    },
+    "tuned WAL (after)": {},
+}
+
+USERS = 50
+HISTORY_PER_USER = 100
+
+def run_profile(args):
+    sys.path.insert(0, BACKEND_DIR)
+    from datetime import datetime
+    from sqlalchemy import select
+    from app import models
+    from app.database import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([models.User(id=i, email=f"u{i}@example.com", username=f"u{i}", password_hash="x")
+                for i in range(1, USERS + 1)])
+    db.add_all([
+        models.WorkoutFeedback(user_id=1 + i % USERS, workout_plan={"exercises": ["Plank"]},
+                               completion_data={"completed_exercises": 1, "total_exercises": 1},
+                               duration_minutes=30, rating=4, created_at=datetime.utcnow())
+        for i in range(USERS * HISTORY_PER_USER)
+    ])
+    db.commit()
+    db.close()
+
+    reads = [0] * args.readers
+    writes = [0] * args.writers
+    deadline = time.perf_counter() + args.duration
+
+    def reader(index):
+        session = SessionLocal()
+        user_id = 1
+        while time.perf_counter() < deadline:
+            session.scalars(
+                select(models.WorkoutFeedback)
+                .where(models.WorkoutFeedback.user_id == user_id)
+                .order_by(models.WorkoutFeedback.created_at.desc())
+                .limit(20)
+            ).all()
+            session.rollback()
+            reads[index] += 1
+            user_id = 1 + user_id % USERS
+        session.close()
+
+    def writer(index):
+        session = SessionLocal()
+        while time.perf_counter() < deadline:
+            session.add(models.WorkoutFeedback(user_id=1 + writes[index] % USERS, workout_plan={},
+                                               completion_data={}, duration_minutes=30, rating=3,
+                                               created_at=datetime.utcnow()))
+            session.commit()
+            writes[index] += 1
+        session.close()
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"{os.environ['BENCH_PROFILE']:>18}: reads {sum(reads) / args.duration:8.1f}/s, "
+          f"writes {sum(writes) / args.duration:7.1f}/s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_profile(args)
+        return
+
+    for name, overrides in PROFILES.items():
+        database = os.path.join(tempfile.mkdtemp(), "bench.db")
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", BENCH_PROFILE=name,
+                   LOG_LEVEL="WARNING", **overrides)
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child",
+                        "--readers", str(args.readers), "--writers", str(args.writers),
+                        "--duration", str(args.duration)],
+                       env=env, check=True)
+
+if __name__ == "__main__":
+    main()
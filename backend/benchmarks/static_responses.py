@@ -0,0 +1,80 @@
+"""Requests/sec for the constant endpoints: per-request JSON encoding vs StaticJSON.
+
+Drives a bare FastAPI app over raw ASGI calls, so the numbers are the
+framework path without network or middleware. "before" returns the payload
+dict and lets FastAPI encode it (the dict is decoded once up front, which
+slightly favors it over rebuilding the literal); "after" serves the
+pre-encoded bytes; "304" revalidates with If-None-Match.
+
+    python benchmarks/static_responses.py [--requests 20000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from app.routers.workouts import BASIC_PLAN, WORKOUT_PLANS  # noqa: E402
+
+def build_app():
+    app = FastAPI()
+    for name, static in (("plans", WORKOUT_PLANS), ("generate-basic", BASIC_PLAN)):
+        payload = json.loads(static.body)
+
+        async def before(payload=payload):
+            return payload
+
+        async def after(request: Request, static=static):
+            return static.response(request)
+
+        app.add_api_route(f"/before/{name}", before, methods=["GET"])
+        app.add_api_route(f"/after/{name}", after, methods=["GET"])
+    return app
+
+async def call(app, path, headers):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": headers, "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+async def rate(app, path, headers, requests, expected):
+    assert await call(app, path, headers) == expected
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path, headers)
+    return requests / (time.perf_counter() - start)
+
+async def run(requests):
+    app = build_app()
+    for name, static in (("plans", WORKOUT_PLANS), ("generate-basic", BASIC_PLAN)):
+        before = await rate(app, f"/before/{name}", [], requests, 200)
+        after = await rate(app, f"/after/{name}", [], requests, 200)
+        revalidated = await rate(app, f"/after/{name}", [(b"if-none-match", static.etag.encode())], requests, 304)
+        print(f"/api/{name:<15} before {before:8.0f} req/s | after {after:8.0f} req/s ({after / before:4.2f}x) | "
+              f"304 {revalidated:8.0f} req/s | {len(static.body)} bytes")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="requests per endpoint and side")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+if __name__ == "__main__":
+    main()
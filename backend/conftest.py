@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+import uuid
+
+# Point the app at a throwaway database before anything imports app.database
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="fitgoalz-tests-"), "test.db")
+os.environ["CATALOG_RELOAD_SECONDS"] = "0"
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+
+    # Entering the client runs the lifespan, which applies migrations
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def make_user(client):
+    """Factory for fresh user rows; password hashing is skipped since tests mint tokens directly"""
+    from app import models
+    from app.database import SessionLocal
+
+    def make():
+        name = uuid.uuid4().hex[:12]
+        db = SessionLocal()
+        try:
+            db_user = models.User(email=f"{name}@example.com", username=name, password_hash="x")
+            db.add(db_user)
+            db.commit()
+            db.refresh(db_user)
+            db.expunge(db_user)
+            return db_user
+        finally:
+            db.close()
+
+    return make
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+@pytest.fixture
+def auth_headers(user):
+    from app.routers.auth import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
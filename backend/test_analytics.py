@@ -0,0 +1,160 @@
+import math
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.analytics import (
+    MOVING_AVERAGE_WINDOW, TREND_WINDOWS, WorkoutSeries, progress_trends, slope, streaks, weekly_buckets,
+)
+from app.database import SessionLocal
+from app.models import WorkoutFeedback
+from app.stats import DEFAULT_DIFFICULTY, DEFAULT_DURATION, DEFAULT_RATING, WEEK_DAYS, WEEKLY_TARGET
+
+TODAY = date(2026, 3, 10)
+
+# Row-loop reference: what the routers computed per workout before the arrays
+
+def _reference_workouts(rows):
+    workouts = []
+    for _, epoch, rating, duration, difficulty, completed, total in sorted(rows, key=lambda row: (row[1], row[0])):
+        completed = completed if completed is not None else 0
+        total = total if total is not None else 1
+        workouts.append({
+            "day": datetime.fromtimestamp(epoch, timezone.utc).date(),
+            "ratings": rating if rating is not None else DEFAULT_RATING,
+            "durations": duration if duration is not None else DEFAULT_DURATION,
+            "difficulty": difficulty if difficulty is not None else DEFAULT_DIFFICULTY,
+            "completion": completed * 100 / total if total > 0 else 0,
+        })
+    return workouts
+
+def _reference_streaks(workouts, today):
+    runs = []
+    previous = None
+    for day in sorted({workout["day"] for workout in workouts}):
+        if previous is not None and (day - previous).days == 1:
+            runs[-1] += 1
+        else:
+            runs.append(1)
+        previous = day
+    current = runs[-1] if runs and previous == today else 0
+    return {"current_streak": current, "best_streak": max(runs, default=0)}
+
+def _reference_buckets(workouts, today, weeks):
+    buckets = {name: [] for name in ("workouts", "ratings", "durations", "difficulty", "completion")}
+    for week in range(weeks - 1, -1, -1):  # oldest first
+        in_week = [w for w in workouts if 0 <= (today - w["day"]).days and (today - w["day"]).days // WEEK_DAYS == week]
+        buckets["workouts"].append(len(in_week))
+        for name in ("ratings", "durations", "difficulty", "completion"):
+            values = [w[name] for w in in_week]
+            buckets[name].append(sum(values) / len(values) if values else math.nan)
+    return buckets
+
+def _reference_slope(values):
+    points = [(x, y) for x, y in enumerate(values) if not math.isnan(y)]
+    if len(points) < 2:
+        return 0.0
+    x_mean = sum(x for x, _ in points) / len(points)
+    y_mean = sum(y for _, y in points) / len(points)
+    return sum((x - x_mean) * (y - y_mean) for x, y in points) / sum((x - x_mean) ** 2 for x, _ in points)
+
+def _history(count, seed, today=TODAY):
+    """(id, epoch, rating, duration, difficulty, completed, total) rows with NULLs, gaps and same-day repeats"""
+    rng = random.Random(seed)
+    noon = datetime(today.year, today.month, today.day, 12, tzinfo=timezone.utc)
+    rows = []
+    for n in range(count):
+        logged_at = noon - timedelta(days=rng.choice((0, 0, 1, 2, 3, 5, 9, 20, 40, 90)) + rng.randrange(40),
+                                     hours=rng.randrange(10))
+        rows.append((
+            n, logged_at.timestamp(), rng.choice((None, 1, 3, 5)), rng.choice((None, 20, 45)),
+            rng.choice((None, 2, 4)), rng.choice((None, 0, 3, 6)), rng.choice((None, 0, 6)),
+        ))
+    rng.shuffle(rows)
+    return rows
+
+def _assert_close(actual, expected):
+    assert np.allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float), equal_nan=True)
+
+@pytest.mark.parametrize("count, seed", [(1, 1), (7, 2), (60, 3), (400, 4)])
+def test_engine_matches_row_loop(count, seed):
+    rows = _history(count, seed)
+    workouts = _reference_workouts(rows)
+    series = WorkoutSeries.from_rows(rows)
+    today = np.datetime64(TODAY, "D")
+
+    assert streaks(series.days, today) == _reference_streaks(workouts, TODAY)
+    for weeks in TREND_WINDOWS:
+        expected = _reference_buckets(workouts, TODAY, weeks)
+        buckets = weekly_buckets(series, today, weeks)
+        for name, values in expected.items():
+            _assert_close(buckets[name], values)
+            assert slope(buckets[name]) == pytest.approx(_reference_slope(values))
+
+    trends = progress_trends(series, TODAY)
+    weekly = len([w for w in workouts if (TODAY - w["day"]).days < WEEK_DAYS])
+    recent = workouts[-MOVING_AVERAGE_WINDOW:]
+    assert trends["total_workouts"] == count
+    assert trends["weekly_workouts"] == weekly
+    assert trends["consistency_score"] == pytest.approx(min(100, weekly / WEEKLY_TARGET * 100))
+    assert trends["recent_average_rating"] == pytest.approx(round(sum(w["ratings"] for w in recent) / len(recent), 2))
+    assert trends["recent_average_completion"] == pytest.approx(
+        round(sum(w["completion"] for w in recent) / len(recent), 1)
+    )
+
+def test_streak_run_lengths():
+    days = np.array(["2026-03-01", "2026-03-02", "2026-03-02", "2026-03-03",  # run of 3, one repeat
+                     "2026-03-05",  # run of 1
+                     "2026-03-07", "2026-03-08", "2026-03-09", "2026-03-10"],  # run of 4 ending today
+                    dtype="datetime64[D]")
+    rng = np.random.default_rng(0)
+    shuffled = rng.permutation(days)
+    assert streaks(shuffled, np.datetime64("2026-03-10")) == {"current_streak": 4, "best_streak": 4}
+    assert streaks(shuffled, np.datetime64("2026-03-11")) == {"current_streak": 0, "best_streak": 4}
+    assert streaks(days[:5], np.datetime64("2026-03-05")) == {"current_streak": 1, "best_streak": 3}
+
+def test_slope_needs_two_points():
+    assert slope(np.array([])) == 0.0
+    assert slope(np.array([math.nan, 4.0, math.nan])) == 0.0
+    assert slope(np.array([math.nan, 1.0, math.nan, 3.0])) == pytest.approx(1.0)
+    assert slope(np.array([2.0, 2.0, 2.0])) == 0.0
+
+def test_empty_history():
+    series = WorkoutSeries.from_rows([])
+    assert len(series) == 0
+    trends = progress_trends(series, TODAY)
+    assert trends["total_workouts"] == 0
+    assert trends["current_streak"] == trends["best_streak"] == 0
+    assert trends["recent_average_rating"] == trends["recent_average_completion"] == 0
+    for weeks in TREND_WINDOWS:
+        trend = trends["trends"][f"{weeks}_weeks"]
+        assert trend["workouts_per_week"] == [0] * weeks
+        assert all(value == 0 for key, value in trend.items() if key.endswith("_slope"))
+
+def test_progress_trends_endpoint(client, user, auth_headers):
+    assert client.get("/api/progress-trends", headers=auth_headers).json()["total_workouts"] == 0
+
+    now = datetime.utcnow().replace(microsecond=0)
+    rows = [(n, 4 if n % 2 else None, {"completed_exercises": n % 4, "total_exercises": 4}, now - timedelta(days=days))
+            for n, days in enumerate((0, 1, 1, 2, 6, 9, 30))]
+    db = SessionLocal()
+    try:
+        db.add_all([
+            WorkoutFeedback(user_id=user.id, rating=rating, completion_data=completion, created_at=created_at)
+            for _, rating, completion, created_at in rows
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    body = client.get("/api/progress-trends", headers=auth_headers).json()
+    reference = [
+        (n, created_at.replace(tzinfo=timezone.utc).timestamp(), rating, DEFAULT_DURATION, None,
+         completion["completed_exercises"], completion["total_exercises"])
+        for n, rating, completion, created_at in rows
+    ]
+    assert body == progress_trends(WorkoutSeries.from_rows(reference), now.date())
+    assert body["current_streak"] == 3 and body["best_streak"] == 3
+    assert body["trends"]["4_weeks"]["workouts_per_week"] == [0, 0, 1, 5]
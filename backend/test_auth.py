@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import httpx
+
+from app import cache, database, security
+from app.database import SessionLocal
+from app.main import app
+from app.routers import auth
+from app.routers.auth import create_access_token, create_refresh_token, principal_cache, token_cache_key
+from app.security import PasswordHasher
+
+def _issue_refresh_token(user_id):
+    db = SessionLocal()
+    try:
+        token = create_refresh_token(db, user_id)
+        db.commit()
+        return token
+    finally:
+        db.close()
+
+def test_refresh_rotates_token(client, user):
+    token = _issue_refresh_token(user.id)
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": token})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["user_id"] == user.id
+    assert body["access_token"]
+    assert body["refresh_token"] and body["refresh_token"] != token
+
+    # The rotated token works once more
+    response = client.post("/api/auth/refresh", json={"refresh_token": body["refresh_token"]})
+    assert response.status_code == 200
+
+def test_replayed_refresh_token_revokes_family(client, user):
+    token = _issue_refresh_token(user.id)
+    rotated = client.post("/api/auth/refresh", json={"refresh_token": token}).json()["refresh_token"]
+
+    replay = client.post("/api/auth/refresh", json={"refresh_token": token})
+    assert replay.status_code == 401
+
+    # The legitimate holder's token was issued from the same login and is revoked too
+    assert client.post("/api/auth/refresh", json={"refresh_token": rotated}).status_code == 401
+
+def test_forged_refresh_token_is_rejected(client, user):
+    jti = _issue_refresh_token(user.id).partition(".")[0]
+    response = client.post("/api/auth/refresh", json={"refresh_token": f"{jti}.forged"})
+    assert response.status_code == 401
+
+def test_principal_cache_is_keyed_by_token_hash(client, user):
+    token = create_access_token({"sub": user.email})
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/auth/me", headers=headers).json()["id"] == user.id
+    assert principal_cache.get(token) is None
+    assert principal_cache.get(token_cache_key(token)).id == user.id
+
+    hits = principal_cache.hits
+    assert client.get("/api/auth/me", headers=headers).json()["id"] == user.id
+    assert principal_cache.hits == hits + 1
+
+def test_cached_principal_expires_with_the_token(client, user, monkeypatch):
+    token = create_access_token({"sub": user.email}, expires_delta=timedelta(seconds=60))
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    now = time.time()
+
+    # Well inside the cache TTL, but past the token's exp
+    monkeypatch.setattr(cache.time, "time", lambda: now + 45)
+    assert principal_cache.get(token_cache_key(token)) is not None
+    monkeypatch.setattr(cache.time, "time", lambda: now + 90)
+    assert principal_cache.get(token_cache_key(token)) is None
+
+def test_account_changes_drop_cached_principals(client, make_user):
+    for change in ("logout", "replay"):
+        user = make_user()
+        token = create_access_token({"sub": user.email})
+        refresh_token = _issue_refresh_token(user.id)
+        assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert principal_cache.get(token_cache_key(token)) is not None
+
+        if change == "logout":
+            client.post("/api/auth/logout", json={"refresh_token": refresh_token})
+        else:
+            client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+            assert principal_cache.get(token_cache_key(token)) is not None
+            assert client.post("/api/auth/refresh", json={"refresh_token": refresh_token}).status_code == 401
+        assert principal_cache.get(token_cache_key(token)) is None, change
+
+class ParkedContext:
+    """Stands in for the bcrypt context; verify blocks its hasher thread until released"""
+
+    def __init__(self):
+        self.released = threading.Event()
+
+    def verify(self, plain_password, hashed_password):
+        self.released.wait(timeout=10)
+        return False
+
+async def _wait_for_pending(hasher, count):
+    for _ in range(200):
+        if hasher.pending == count:
+            return
+        await asyncio.sleep(0.01)
+
+def test_db_endpoints_stay_available_during_login_storm(client, make_user, auth_headers, monkeypatch):
+    users = [make_user() for _ in range(4)]
+    hasher = PasswordHasher(max_workers=len(users), max_pending=len(users))
+    context = ParkedContext()
+    monkeypatch.setattr(auth, "password_hasher", hasher)
+    monkeypatch.setattr(security, "pwd_context", context)
+
+    async def storm():
+        # Fewer request slots than logins parked in bcrypt
+        monkeypatch.setattr(database, "request_session_slots", asyncio.Semaphore(2))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            logins = [
+                asyncio.create_task(http.post("/api/auth/login", data={"username": u.email, "password": "pw"}))
+                for u in users
+            ]
+            await _wait_for_pending(hasher, len(users))
+            try:
+                history = await asyncio.wait_for(http.get("/api/my-workouts", headers=auth_headers), timeout=5)
+            finally:
+                context.released.set()
+            return history, await asyncio.gather(*logins)
+
+    try:
+        history, logins = asyncio.run(storm())
+    finally:
+        hasher.shutdown()
+    assert history.status_code == 200
+    assert [response.status_code for response in logins] == [401] * len(users)
+
+def test_saturated_hasher_sheds_logins_with_503(client, make_user, monkeypatch):
+    parked, shed = make_user(), make_user()
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    context = ParkedContext()
+    monkeypatch.setattr(auth, "password_hasher", hasher)
+    monkeypatch.setattr(security, "pwd_context", context)
+
+    async def saturate():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = asyncio.create_task(http.post("/api/auth/login", data={"username": parked.email, "password": "pw"}))
+            await _wait_for_pending(hasher, 1)
+            try:
+                second = await http.post("/api/auth/login", data={"username": shed.email, "password": "pw"})
+            finally:
+                context.released.set()
+            return await first, second
+
+    try:
+        first, second = asyncio.run(saturate())
+    finally:
+        hasher.shutdown()
+    assert first.status_code == 401
+    assert second.status_code == 503
+    assert second.headers["retry-after"] == "1"
+    assert hasher.rejected == 1
@@ -0,0 +1,74 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, accepted_encodings, negotiate
+
+SMALL = "x" * 100
+LARGE = "fitgoalz " * 500
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse(SMALL)
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse(LARGE)
+
+    return TestClient(app)
+
+def test_accepted_encodings_parses_q_values():
+    assert accepted_encodings("gzip;q=0.5, BR ,identity; q=0, *;q=0.1, bad;q=x") == {
+        "gzip": 0.5, "br": 1.0, "identity": 0.0, "*": 0.1, "bad": 0.0,
+    }
+    assert accepted_encodings("") == {}
+
+def test_negotiate_honours_q_values():
+    assert negotiate("gzip, br", brotli_available=True) == "br"
+    assert negotiate("gzip, br", brotli_available=False) == "gzip"
+    assert negotiate("gzip;q=1, br;q=0.5", brotli_available=True) == "gzip"
+    assert negotiate("br;q=0, gzip;q=0.2", brotli_available=True) == "gzip"
+    assert negotiate("*", brotli_available=True) == "br"
+    assert negotiate("*;q=0.3, br;q=0", brotli_available=True) == "gzip"
+    assert negotiate("gzip;q=0, *;q=0", brotli_available=True) is None
+    assert negotiate("identity", brotli_available=True) is None
+    assert negotiate("", brotli_available=True) is None
+
+def test_small_responses_are_not_compressed():
+    response = _client().get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == SMALL
+
+def test_large_responses_are_gzipped_and_vary():
+    response = _client().get("/large", headers={"Accept-Encoding": "gzip;q=1, br;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(LARGE)
+    assert response.text == LARGE
+
+def test_identity_responses_still_vary():
+    response = _client().get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == LARGE
+
+def test_large_responses_use_brotli_when_available():
+    brotli = pytest.importorskip("brotli")
+    with _client().stream("GET", "/large", headers={"Accept-Encoding": "gzip, br"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert brotli.decompress(raw).decode() == LARGE
+
+def test_gzip_stream_is_valid_on_its_own():
+    client = _client()
+    with client.stream("GET", "/large", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw).decode() == LARGE
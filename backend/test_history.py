@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app import queries
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
+from app.models import User, WorkoutFeedback
+from app.stats import rebuild_stats
+
+# Three workouts share each of the first two seconds, the way a burst of offline
+# logs syncing at once lands; one sits alone at the newest second
+TIMESTAMPS = [datetime(2024, 5, 1, 9, 0, 0)] * 3 + [datetime(2024, 5, 1, 9, 0, 1)] * 3 + [datetime(2024, 5, 1, 9, 0, 2)]
+
+def _seed_workouts(db, user_id):
+    workouts = [
+        WorkoutFeedback(user_id=user_id, workout_name=f"Session {n}", rating=3, created_at=created_at)
+        for n, created_at in enumerate(TIMESTAMPS)
+    ]
+    db.add_all(workouts)
+    db.commit()
+    # Rows added by hand bypass apply_workout, so the rollup is rebuilt as the stats CLI would
+    rebuild_stats(db, user_id)
+    db.commit()
+    return [workout.id for workout in workouts]
+
+def test_keyset_pages_cover_ties_exactly_once():
+    engine = create_engine("sqlite://")
+    run_migrations(engine)
+    with Session(engine) as db:
+        user = User(email="pager@example.com", username="pager", password_hash="x")
+        db.add(user)
+        db.commit()
+        ids = _seed_workouts(db, user.id)
+        # Newest second first, ids ascending inside each second
+        expected = sorted(ids, key=lambda workout_id: (-TIMESTAMPS[ids.index(workout_id)].timestamp(), workout_id))
+
+        for limit in (1, 2, 3, 4):
+            seen, cursor = [], None
+            while True:
+                rows = db.scalars(queries.workout_history_page(user.id, limit, cursor)).all()
+                page = rows[:limit]
+                seen.extend(workout.id for workout in page)
+                if len(rows) <= limit:
+                    break
+                cursor = queries.encode_cursor(page[-1])
+            assert seen == expected, limit
+
+def test_cursor_round_trips_and_rejects_garbage():
+    assert queries.decode_cursor(queries.encode_cursor(WorkoutFeedback(id=1234))) == 1234
+    for bad in ("not-a-cursor", "!!!", queries.encode_cursor(WorkoutFeedback(id="x"))):
+        with pytest.raises(ValueError):
+            queries.decode_cursor(bad)
+
+def test_my_workouts_pages_through_ties(client, user, auth_headers):
+    db = SessionLocal()
+    try:
+        ids = _seed_workouts(db, user.id)
+    finally:
+        db.close()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lower())
+
+    seen, params = [], {"limit": 2, "fields": "id"}
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        while True:
+            body = client.get("/api/my-workouts", params=params, headers=auth_headers).json()
+            assert body["total_workouts"] == len(ids)
+            seen.extend(workout["id"] for workout in body["workouts"])
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # The total comes from the stats rollup, not a COUNT over the history per page
+    assert statements and not any("count(" in statement for statement in statements)
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+    # The lone newest workout comes first
+    assert seen[0] == ids[-1]
+
+def test_my_workouts_rejects_bad_cursor(client, auth_headers):
+    response = client.get("/api/my-workouts", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -4,7 +4,11 @@ import os
 # Add the app directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
-from ml.workout_generator import WorkoutGenerator
+import json
+import pytest
+from datetime import date, datetime
+from ml.catalog import DEFAULT_CATALOG_PATH, INJURY_BITS, MIN_CANDIDATES, compile_constraints, load_catalog
+from ml.workout_generator import WorkoutGenerator, plan_seed, program_seed, program_week
 
 def test_workout_generator():
     print("🧪 Testing ML Workout Generator...")
@@ -65,5 +69,205 @@ def test_workout_generator():
     print(f"Plan: {workout_3['plan_name']}")
     print(f"Exercises: {workout_3['exercises']}")
 
+def test_batch_generation_matches_single_profile_rules():
+    generator = WorkoutGenerator()
+    profiles = [
+        {'weight': 50, 'height': 175, 'fitness_level': 'beginner', 'goals': 'weight_loss', 'workout_duration': 20},
+        {'weight': 80, 'height': 180, 'fitness_level': 'intermediate', 'goals': 'muscle_gain',
+         'workout_days': 4, 'workout_duration': 45},
+        {'weight': 95, 'height': 170, 'fitness_level': 'advanced', 'goals': 'endurance', 'workout_duration': 40},
+        {'weight': 70, 'height': 170, 'fitness_level': 'beginner', 'goals': 'weight_loss'},
+    ]
+
+    plans = generator.generate_workout_plans(profiles)
+
+    assert len(plans) == len(profiles)
+    for profile, plan in zip(profiles, plans):
+        expected = generator.generate_workout_plan(profile)
+        for key in ("plan_name", "fitness_level", "goal", "duration", "days_per_week", "bmi_analysis", "recommendations"):
+            assert plan[key] == expected[key], key
+        assert len(plan["exercises"]) == len(expected["exercises"])
+        assert len(set(plan["exercises"])) == len(plan["exercises"])
+        library = generator.catalog.bucket(profile['fitness_level'], profile['goals'])
+        assert set(plan["exercises"]) <= {exercise.name for exercise in library}
+        assert [entry["exercise"] for entry in plan["workout_structure"]] == plan["exercises"]
+
+def test_catalog_indexes():
+    catalog = WorkoutGenerator().catalog
+
+    for exercise in catalog.exercises:
+        # Rep schemes keep the rule the generator used to apply to names on every request
+        name_rule = "8-12" if any(word in exercise.name for word in ("Push", "Pull", "Squat")) else "30-60 seconds"
+        assert exercise.rep_scheme == name_rule, exercise.name
+        assert catalog.get(exercise.name) is exercise
+        assert exercise.id in catalog.with_attribute("equipment", exercise.equipment)
+        for group in exercise.muscle_groups:
+            assert exercise.id in catalog.with_attribute("muscle_groups", group)
+
+    assert [exercise.name for exercise in catalog.bucket('beginner', 'muscle_gain')][-2:] == ["Assisted Pullups", "Side Planks"]
+    assert catalog.bucket('expert', 'weight_loss') == ()
+    assert catalog.with_attribute("impact", "unknown") == frozenset()
+
+def test_equipment_and_injuries_filter_exercises():
+    generator = WorkoutGenerator()
+    profile = {
+        'weight': 70, 'height': 175, 'fitness_level': 'advanced', 'goals': 'endurance',
+        'workout_duration': 60, 'equipment': 'home', 'injuries': 'Sore left knee',
+    }
+
+    for plan in [generator.generate_workout_plan(profile), *generator.generate_workout_plans([profile] * 20)]:
+        exercises = [generator.catalog.get(name) for name in plan["exercises"]]
+        assert exercises
+        for exercise in exercises:
+            assert exercise.equipment in ("none", "wall"), exercise.name
+            assert "knee" not in exercise.contraindications, exercise.name
+            assert exercise.impact == "low", exercise.name
+
+    # No equipment choice and no injuries leave the bucket untouched
+    assert generator.catalog.candidates('advanced', 'endurance', compile_constraints(None, None)) == \
+        generator.catalog.bucket('advanced', 'endurance')
+
+def test_seeded_plans_are_reproducible_and_cached():
+    generator = WorkoutGenerator()
+    profile = {'weight': 80, 'height': 180, 'fitness_level': 'intermediate', 'goals': 'endurance', 'workout_duration': 30}
+    seed = plan_seed(7, date(2026, 10, 16))
+    assert plan_seed(7, date(2026, 10, 12)) == seed  # same ISO week
+
+    first = generator.generate_workout_plan(profile, seed=seed)
+    assert generator.generate_workout_plan(profile, seed=seed) == first
+    assert WorkoutGenerator().generate_workout_plan(profile, seed=seed) == first
+    assert generator.plan_cache.stats()["hits"] == 1
+
+    # Header fields come from the profile even when the body is cached
+    assert generator.generate_workout_plan({**profile, 'workout_duration': 35}, seed=seed)["duration"] == 35
+    assert generator.plan_cache.stats()["hits"] == 2
+
+    generator.set_catalog(load_catalog())
+    assert len(generator.plan_cache) == 0
+
+def test_recent_exercises_are_down_weighted():
+    generator = WorkoutGenerator()
+    profile = {'weight': 80, 'height': 180, 'fitness_level': 'beginner', 'goals': 'muscle_gain', 'workout_duration': 15}
+    bucket = [exercise.name for exercise in generator.catalog.bucket('beginner', 'muscle_gain')]
+    recent = bucket[:len(bucket) // 2]
+
+    repeats = sum(
+        len(set(generator.generate_workout_plan(profile, seed=seed, recent_exercises=recent)["exercises"]) & set(recent))
+        for seed in range(200)
+    )
+    baseline = sum(
+        len(set(generator.generate_workout_plan(profile, seed=seed)["exercises"]) & set(recent))
+        for seed in range(200)
+    )
+    assert repeats < baseline * 0.6
+
+    # The recent set is part of the cache key; names outside the bucket do not split it
+    plan = generator.generate_workout_plan(profile, seed=1, recent_exercises=recent)
+    assert generator.generate_workout_plan(profile, seed=1, recent_exercises=[*recent, "Burpees"]) == plan
+    assert generator.generate_workout_plan(profile, seed=1) != plan
+
+def test_program_weeks_are_lazy_and_periodized():
+    generator = WorkoutGenerator()
+    profile = {'weight': 70, 'height': 175, 'fitness_level': 'beginner', 'goals': 'muscle_gain',
+               'workout_days': 4, 'workout_duration': 30}
+    program = generator.generate_program(profile, weeks=12, seed=(3, 2026, 42))
+    assert len(program) == 12
+
+    weeks = list(program.iter_weeks(3, 3))
+    assert [week["week"] for week in weeks] == [3, 4, 5]
+    assert [week["phase"] for week in weeks] == ["build", "deload", "build"]
+    assert all(len(week["sessions"]) == 4 for week in weeks)
+    assert weeks[0]["sessions"][0]["workout_structure"][0]["sets"] == 3
+    assert weeks[1]["sessions"][0]["workout_structure"][0]["sets"] == 2
+    assert weeks[2]["sessions"][0]["workout_structure"][0]["sets"] == 4
+
+    # Weeks are rebuilt identically on every read and keep the block's exercises
+    assert program.week(3) == weeks[0]
+    assert program.week(1)["sessions"][0]["exercises"] == weeks[0]["sessions"][0]["exercises"]
+    assert [week["week"] for week in program][-1] == 12
+
+def test_catalog_hot_reload_swaps_versions(tmp_path):
+    with open(DEFAULT_CATALOG_PATH) as data_file:
+        data = json.load(data_file)
+    catalog_path = tmp_path / "exercises.json"
+    catalog_path.write_text(json.dumps(data))
+
+    generator = WorkoutGenerator(catalog_path=str(catalog_path))
+    profile = {'weight': 70, 'height': 175, 'fitness_level': 'beginner', 'goals': 'endurance', 'workout_duration': 60}
+    generator.generate_workout_plan(profile, seed=1)
+    assert not generator.reload_catalog()  # unchanged file
+
+    data["version"] = "test-2"
+    data["library"]["beginner"]["endurance"].remove("Arm Circles")
+    catalog_path.write_text(json.dumps(data))
+    assert generator.reload_catalog()
+    assert generator.catalog.version == "test-2"
+    assert len(generator.plan_cache) == 0
+    assert "Arm Circles" not in generator.generate_workout_plan(profile, seed=1)["exercises"]
+
+    # A broken file raises and leaves the loaded catalog in place
+    catalog_path.write_text("{not json")
+    with pytest.raises(ValueError):
+        generator.reload_catalog()
+    assert generator.catalog.version == "test-2"
+
+def test_program_is_anchored_to_its_start():
+    started = datetime(2026, 3, 4, 18, 30)
+    assert program_week(started, date(2026, 3, 4)) == 1
+    assert program_week(started, date(2026, 3, 10)) == 1
+    assert program_week(started, date(2026, 3, 11)) == 2
+    assert program_week(started, date(2026, 5, 27)) == 13
+    assert program_week(started, date(2026, 3, 1)) == 1
+    assert program_week(None, date(2026, 3, 11)) == 1
+
+    # The seed does not move with the calendar, so later reads see the same weeks
+    generator = WorkoutGenerator()
+    profile = {'fitness_level': 'intermediate', 'goals': 'muscle_gain', 'workout_days': 3, 'workout_duration': 45}
+    first = generator.generate_program(profile, weeks=8, seed=program_seed(7, started))
+    again = generator.generate_program(profile, weeks=8, seed=program_seed(7, started))
+    assert list(first) == list(again)
+    assert program_seed(7, started) != program_seed(7, datetime(2026, 4, 1))
+
+def test_constrained_pools_are_widened_safely():
+    generator = WorkoutGenerator()
+    catalog = generator.catalog
+    profile = {
+        'weight': 70, 'height': 175, 'fitness_level': 'intermediate', 'goals': 'muscle_gain',
+        'workout_duration': 60, 'equipment': 'home', 'injuries': 'bad knee and sore wrist',
+    }
+    blocked = compile_constraints(profile['equipment'], profile['injuries'])
+    bucket = catalog.bucket('intermediate', 'muscle_gain')
+    assert len([exercise for exercise in bucket if not exercise.mask & blocked]) < MIN_CANDIDATES
+
+    # Other goals and levels fill the pool before any constraint is relaxed
+    pool = catalog.candidates('intermediate', 'muscle_gain', blocked)
+    assert len(pool) >= MIN_CANDIDATES
+    assert all(not exercise.mask & blocked for exercise in pool)
+    plan = generator.generate_workout_plan(profile)
+    assert len(set(plan["exercises"])) >= MIN_CANDIDATES
+    for exercise in map(catalog.get, plan["exercises"]):
+        assert not {"knee", "wrist"} & set(exercise.contraindications), exercise.name
+
+    # With every injury listed only one exercise fits; the rest conflict with as few as possible
+    everything = compile_constraints('home', 'knees, ankles, wrists, shoulders and lower back pain')
+    assert len([exercise for exercise in catalog.exercises if not exercise.mask & everything]) <= 1
+    pool = catalog.candidates('advanced', 'weight_loss', everything)
+    assert len(pool) == MIN_CANDIDATES and len(set(pool)) == len(pool)
+    assert [bin(exercise.mask & everything).count("1") for exercise in pool] == \
+        sorted(bin(exercise.mask & everything).count("1") for exercise in pool)
+
+    # An unknown bucket stays empty rather than borrowing exercises
+    assert catalog.candidates('expert', 'weight_loss', everything) == ()
+
+def test_injury_keywords_match_whole_words():
+    for text in ("mild discomfort", "open to feedback", "handles heavy loads", "backpacking trips",
+                 "I'm back after a break", "on the other hand, fine", "6 feet tall"):
+        assert compile_constraints(None, text) == 0, text
+
+    assert compile_constraints(None, "herniated disc") == INJURY_BITS["lower_back"]
+    assert compile_constraints(None, "Lower back pain") == INJURY_BITS["lower_back"]
+    assert compile_constraints(None, "broken left hand") == INJURY_BITS["wrist"]
+    assert compile_constraints(None, "torn meniscus, sore ankles") == INJURY_BITS["knee"] | INJURY_BITS["ankle"]
+
 if __name__ == "__main__":
-    test_workout_generator()
\ No newline at end of file
+    test_workout_generator()
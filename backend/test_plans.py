@@ -0,0 +1,48 @@
+import asyncio
+from datetime import date, datetime
+
+from sqlalchemy import select
+from app.database import session_scope
+from app.models import UserNextPlan
+from app.plans import build_next_plan, get_next_plan, next_plan_inputs
+from app.profiles import ProfileSnapshot
+
+def _profile(user_id):
+    return ProfileSnapshot(
+        id=user_id, user_id=user_id, age=30, weight=80.0, height=180.0, gender="female",
+        fitness_level="beginner", goals="muscle_gain", workout_days=3, workout_duration=30,
+        activity_level="moderate", injuries=None, equipment=None,
+        created_at=datetime(2026, 1, 5), updated_at=datetime(2026, 1, 5),
+    )
+
+def test_concurrent_first_plan_builds_do_not_collide(client, user):
+    profile = _profile(user.id)
+    today = date(2026, 1, 7)
+
+    async def store(seed, recent, ready):
+        async with session_scope() as db:
+            # Both sessions hold a warm connection before either looks for the row
+            await db.execute(select(1))
+            await ready.wait()
+            plan = await build_next_plan(db, user.id, profile, seed, recent)
+            await db.commit()
+            return plan
+
+    async def race():
+        async with session_scope() as db:
+            seed, recent = await next_plan_inputs(db, user.id, today)
+        # A cold miss in /generate-workout and a background refresh storing the
+        # user's first plan at once
+        ready = asyncio.Barrier(2)
+        return await asyncio.gather(store(seed, recent, ready), store(seed, recent, ready))
+
+    plan, other = asyncio.run(race())
+    assert plan == other
+
+    async def reread():
+        async with session_scope() as db:
+            return await get_next_plan(db, user.id, profile, today)
+
+    stored, precomputed = asyncio.run(reread())
+    assert precomputed
+    assert stored == plan
@@ -0,0 +1,58 @@
+from app import cache
+from app.database import SessionLocal
+from app.models import UserProfile
+from app.profiles import ProfileSnapshot, profile_cache
+from app.routers import profile as profile_router
+
+PROFILE = {"age": 30, "weight": 80.0, "height": 180.0, "fitness_level": "beginner", "goals": "muscle_gain"}
+
+def _update_row_behind_cache(user_id, **values):
+    """Change the stored profile the way another worker would, without touching this process's cache"""
+    db = SessionLocal()
+    try:
+        db.query(UserProfile).filter(UserProfile.user_id == user_id).update(values)
+        db.commit()
+    finally:
+        db.close()
+
+def test_save_writes_the_snapshot_through(client, user, auth_headers):
+    # A user without a profile is cached as None
+    assert client.get("/api/fitness-profile", headers=auth_headers).json()["age"] is None
+    assert profile_cache.get(user.id, "missing") is None
+
+    response = client.post("/api/fitness-profile", json=PROFILE, headers=auth_headers)
+    assert response.status_code == 200
+    snapshot = profile_cache.get(user.id)
+    assert isinstance(snapshot, ProfileSnapshot)
+    assert (snapshot.age, snapshot.goals) == (30, "muscle_gain")
+
+    # An update replaces the snapshot; reads are served from it, not the table
+    client.post("/api/fitness-profile", json={"age": 31}, headers=auth_headers)
+    assert profile_cache.get(user.id).age == 31
+    _update_row_behind_cache(user.id, age=99)
+    assert client.get("/api/fitness-profile", headers=auth_headers).json()["age"] == 31
+
+def test_failed_save_invalidates_the_snapshot(client, user, auth_headers, monkeypatch):
+    client.post("/api/fitness-profile", json=PROFILE, headers=auth_headers)
+    _update_row_behind_cache(user.id, age=42)
+
+    async def failing_bump(db, user_id):
+        raise RuntimeError("version table unavailable")
+
+    monkeypatch.setattr(profile_router, "bump_data_version", failing_bump)
+    response = client.post("/api/fitness-profile", json={"age": 50}, headers=auth_headers)
+    assert response.status_code == 500
+    assert profile_cache.get(user.id, "missing") == "missing"
+
+    # The next read goes back to the table rather than a stale or half-saved snapshot
+    monkeypatch.undo()
+    assert client.get("/api/fitness-profile", headers=auth_headers).json()["age"] == 42
+
+def test_snapshot_expires_after_the_ttl(client, user, auth_headers, monkeypatch):
+    client.post("/api/fitness-profile", json=PROFILE, headers=auth_headers)
+    _update_row_behind_cache(user.id, goals="endurance")
+    assert client.get("/api/fitness-profile", headers=auth_headers).json()["goals"] == "muscle_gain"
+
+    now = cache.time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now + profile_cache.ttl + 1)
+    assert client.get("/api/fitness-profile", headers=auth_headers).json()["goals"] == "endurance"
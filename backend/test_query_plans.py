@@ -0,0 +1,39 @@
+import sys
+import os
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import create_engine, text
+from app import queries
+from app.migrations import run_migrations
+from app.models import WorkoutFeedback
+
+def _plan(conn, statement):
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return [row[-1] for row in rows]
+
+def test_hot_queries_use_indexes():
+    engine = create_engine("sqlite://")
+    run_migrations(engine)
+
+    hot_queries = {
+        "history": queries.workout_history(1),
+        "history page": queries.workout_history_page(1, 20),
+        "history next page": queries.workout_history_page(1, 20, queries.encode_cursor(WorkoutFeedback(id=40))),
+        "recent workouts": queries.recent_workouts(1, 6),
+        "analytics series": queries.workout_series(1),
+        "workout details": queries.user_workout(1, 1),
+        "profile": queries.user_profile(1),
+    }
+    with engine.connect() as conn:
+        for name, statement in hot_queries.items():
+            plan = _plan(conn, statement)
+            assert not any(step.startswith("SCAN") for step in plan), (name, plan)
+            assert not any("TEMP B-TREE" in step for step in plan), (name, plan)
+
+def test_migrations_are_idempotent():
+    engine = create_engine("sqlite://")
+    version = run_migrations(engine)
+    assert run_migrations(engine) == version
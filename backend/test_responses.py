@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal, session_scope
+from app.models import WorkoutFeedback
+from app.responses import FastJSONResponse, StaticJSON, dumps
+from app.routers.workouts import BASIC_PLAN
+from app.versions import bump_data_version
+
+def test_static_get_revalidates(client):
+    first = client.get("/api/generate-basic")
+    assert first.status_code == 200
+    assert first.headers["etag"] == BASIC_PLAN.etag
+    assert first.headers["cache-control"].startswith("public")
+
+    again = client.get("/api/generate-basic", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.content == b""
+
+def test_static_post_is_never_cached(client):
+    response = client.post("/api/generate-basic", headers={"If-None-Match": BASIC_PLAN.etag})
+    assert response.status_code == 200
+    assert response.json()["plan_name"] == "Basic Full Body Workout"
+    assert "etag" not in response.headers
+    assert "cache-control" not in response.headers
+
+def _bump(user_id):
+    async def bump():
+        async with session_scope() as db:
+            await bump_data_version(db, user_id)
+            await db.commit()
+    asyncio.run(bump())
+
+def test_polled_reads_answer_304_until_data_changes(client, user, auth_headers):
+    for path in ("/api/my-workouts", "/api/progress-analytics", "/api/fitness-profile"):
+        first = client.get(path, headers=auth_headers)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        assert first.headers["cache-control"] == "private, no-cache"
+
+        cached = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+        assert cached.status_code == 304, path
+        assert cached.headers["etag"] == etag
+
+    _bump(user.id)
+    for path in ("/api/my-workouts", "/api/progress-analytics", "/api/fitness-profile"):
+        stale = client.get(path, headers=auth_headers).headers["etag"]
+        refreshed = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+        assert refreshed.status_code == 200, path
+        assert refreshed.headers["etag"] == stale
+
+def test_my_workouts_etag_names_the_page(client, user, auth_headers):
+    db = SessionLocal()
+    try:
+        db.add_all([WorkoutFeedback(user_id=user.id, workout_name=f"Session {n}") for n in range(3)])
+        db.commit()
+    finally:
+        db.close()
+
+    first = client.get("/api/my-workouts", params={"limit": 1}, headers=auth_headers)
+    etag, cursor = first.headers["etag"], first.json()["next_cursor"]
+    assert cursor is not None
+
+    for params in ({"limit": 1, "cursor": cursor}, {"limit": 2}, {"limit": 1, "fields": "id"}):
+        other = client.get("/api/my-workouts", params=params, headers={**auth_headers, "If-None-Match": etag})
+        assert other.status_code == 200, params
+        assert other.headers["etag"] != etag
+
+    # Spelling the default query out names the same page
+    same = client.get("/api/my-workouts", params={"limit": "01"}, headers={**auth_headers, "If-None-Match": etag})
+    assert same.status_code == 304
+
+def test_fast_json_response_encodes_numpy_and_int_keys():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    payload = {"workouts": np.arange(3), "slope": np.float64(0.25), "by_week": {1: np.int64(4)}, "name": "Café"}
+
+    @app.get("/returned")
+    async def returned():
+        return {"name": "Café", "count": 2}
+
+    @app.get("/direct")
+    async def direct():
+        return FastJSONResponse(payload)
+
+    client = TestClient(app)
+    assert client.get("/returned").json() == {"name": "Café", "count": 2}
+    response = client.get("/direct")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"workouts": [0, 1, 2], "slope": 0.25, "by_week": {"1": 4}, "name": "Café"}
+
+def test_static_json_uses_the_app_encoder():
+    content = {"plan_name": "Café circuit", "exercises": [{"name": "Plank", "sets": 3}]}
+    static = StaticJSON(content)
+    assert static.body == dumps(content) == FastJSONResponse(content).body
+    assert json.loads(static.body) == content
+
+def test_history_schemas_are_documented_not_enforced(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    for path, schema in (("/api/my-workouts", "WorkoutHistoryPage"),
+                         ("/api/workout-details/{workout_id}", "WorkoutDetails")):
+        body = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert body == {"$ref": f"#/components/schemas/{schema}"}, path
+
+def test_no_route_is_shadowed(client):
+    from app.routers import auth, feedback, profile, workouts
+
+    # Every router is included under /api, so a repeated method and path means the later one never runs
+    seen = set()
+    for router in (auth.router, workouts.router, feedback.router, profile.router):
+        for route in router.routes:
+            for method in route.methods:
+                assert (method, route.path) not in seen, f"{method} {route.path} is registered twice"
+                seen.add((method, route.path))
+    assert client.get("/api/").json()["message"].startswith("Enhanced AI-powered workout logging")
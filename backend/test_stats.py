@@ -0,0 +1,172 @@
+import asyncio
+import os
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database import SyncSessionAdapter
+from app.migrations import run_migrations
+from app.models import User, UserWorkoutStats, WorkoutFeedback
+from app.stats import (
+    RECENT_SESSIONS, apply_workout, new_stats, rebuild_stats, recent_sessions, record_workout, summarize_stats,
+)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ROLLUP_COLUMNS = (
+    "total_workouts", "rating_sum", "duration_sum", "difficulty_sum", "last_workout_date",
+    "current_streak", "daily_counts", "workout_type_counts", "recent_exercises",
+)
+
+def _workout(rating=None, duration=None, difficulty=None, workout_type=None, exercises=()):
+    return SimpleNamespace(
+        rating=rating, duration_minutes=duration, difficulty_rating=difficulty,
+        workout_type=workout_type, workout_plan={"exercises": list(exercises)},
+    )
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    run_migrations(engine)
+    return engine
+
+def _add_user(engine):
+    with Session(engine) as db:
+        user = User(email="stats@example.com", username="stats", password_hash="x")
+        db.add(user)
+        db.commit()
+        return user.id
+
+def test_record_workout_sums_counts_and_defaults():
+    stats = new_stats(1)
+    record_workout(stats, _workout(5, 45, 4, "custom", ["Plank"]), datetime(2026, 3, 2, 8))
+    record_workout(stats, _workout(), datetime(2026, 3, 2, 19))
+
+    assert stats.total_workouts == 2
+    assert stats.rating_sum == 5 + 3
+    assert stats.duration_sum == 45 + 30
+    assert stats.difficulty_sum == 4 + 3
+    assert stats.workout_type_counts == {"custom": 1, "ml_generated": 1}
+    assert stats.daily_counts == {"2026-03-02": 2}
+    assert recent_sessions(stats.recent_exercises) == [["Plank"], []]
+
+def test_daily_counts_keep_only_the_trailing_week():
+    stats = new_stats(1)
+    record_workout(stats, _workout(), datetime(2026, 3, 1))
+    record_workout(stats, _workout(), datetime(2026, 3, 5))
+    record_workout(stats, _workout(), datetime(2026, 3, 9))
+    assert stats.daily_counts == {"2026-03-05": 1, "2026-03-09": 1}
+
+def test_recent_exercises_ring_keeps_the_last_sessions():
+    stats = new_stats(1)
+    for n in range(RECENT_SESSIONS + 2):
+        record_workout(stats, _workout(exercises=[f"Exercise {n}"]), datetime(2026, 3, 1 + n))
+    assert recent_sessions(stats.recent_exercises) == [
+        [f"Exercise {n}"] for n in range(2, RECENT_SESSIONS + 2)
+    ]
+
+def test_streak_rolls_over_days():
+    stats = new_stats(1)
+    start = datetime(2026, 3, 30, 21)
+    for offset in range(3):  # three consecutive days, across a month boundary
+        record_workout(stats, _workout(), start + timedelta(days=offset))
+    assert stats.current_streak == 3
+    assert stats.last_workout_date == date(2026, 4, 1)
+
+    # A second workout the same day and a late backfill leave the streak alone
+    record_workout(stats, _workout(), datetime(2026, 4, 1, 23))
+    record_workout(stats, _workout(), datetime(2026, 3, 20))
+    assert stats.current_streak == 3
+    assert stats.last_workout_date == date(2026, 4, 1)
+
+    # Skipping a day starts over
+    record_workout(stats, _workout(), datetime(2026, 4, 3))
+    assert stats.current_streak == 1
+
+    # The streak is only reported while it reaches today
+    assert summarize_stats(stats, date(2026, 4, 3))["current_streak"] == 1
+    assert summarize_stats(stats, date(2026, 4, 4))["current_streak"] == 0
+    assert summarize_stats(new_stats(1), date(2026, 4, 4)) is None
+
+def test_apply_workout_reads_past_a_stale_identity_map(tmp_path):
+    engine = _engine(tmp_path)
+    user_id = _add_user(engine)
+
+    async def log(db, logged_at):
+        workout = WorkoutFeedback(user_id=user_id, rating=4, created_at=logged_at)
+        db.add(workout)
+        await db.flush()
+        await apply_workout(db, workout, logged_at)
+        await db.commit()
+
+    with Session(engine, expire_on_commit=False) as first, Session(engine) as second:
+        db = SyncSessionAdapter(first)
+        asyncio.run(log(db, datetime(2026, 3, 1)))
+        # Held, as log-workout holds the row it loaded for feedback
+        held = first.get(UserWorkoutStats, user_id)
+        assert held.total_workouts == 1
+
+        # Another request logs a workout in the meantime
+        asyncio.run(log(SyncSessionAdapter(second), datetime(2026, 3, 2)))
+
+        asyncio.run(log(db, datetime(2026, 3, 3)))
+        assert held.total_workouts == 3
+
+    with Session(engine) as db:
+        assert db.get(UserWorkoutStats, user_id).total_workouts == 3
+
+def _log_history(engine, user_id):
+    days = [datetime(2026, 3, 1, 7), datetime(2026, 3, 2, 7), datetime(2026, 3, 2, 18),
+            datetime(2026, 3, 3, 7), datetime(2026, 3, 6, 7), datetime(2026, 3, 7, 7)]
+    workouts = [
+        WorkoutFeedback(
+            user_id=user_id, rating=1 + n % 5, duration_minutes=20 + n, difficulty_rating=None if n % 2 else 4,
+            workout_type="custom" if n % 3 == 0 else None, workout_plan={"exercises": [f"Move {n}", "Plank"]},
+            created_at=logged_at,
+        )
+        for n, logged_at in enumerate(days)
+    ]
+
+    async def log(db):
+        for workout in workouts:
+            db.add(workout)
+            await db.flush()
+            await apply_workout(db, workout, workout.created_at)
+        await db.commit()
+
+    with Session(engine) as session:
+        asyncio.run(log(SyncSessionAdapter(session)))
+
+def _rollup(engine, user_id):
+    with Session(engine) as db:
+        stats = db.get(UserWorkoutStats, user_id)
+        return {column: getattr(stats, column) for column in ROLLUP_COLUMNS}
+
+def test_rebuild_matches_incremental_rollup(tmp_path):
+    engine = _engine(tmp_path)
+    user_id = _add_user(engine)
+    _log_history(engine, user_id)
+    incremental = _rollup(engine, user_id)
+
+    with Session(engine) as db, db.begin():
+        assert rebuild_stats(db, user_id) == 1
+    assert _rollup(engine, user_id) == incremental
+
+def test_stats_module_rebuilds_from_the_command_line(tmp_path):
+    engine = _engine(tmp_path)
+    user_id = _add_user(engine)
+    _log_history(engine, user_id)
+    incremental = _rollup(engine, user_id)
+    with engine.begin() as conn:
+        conn.execute(UserWorkoutStats.__table__.delete())
+
+    env = dict(os.environ, DATABASE_URL=str(engine.url), LOG_LEVEL="WARNING")
+    result = subprocess.run(
+        [sys.executable, "-m", "app.stats", "--user-id", str(user_id)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    assert "Rebuilt workout stats for 1 user(s)" in result.stdout
+    assert _rollup(engine, user_id) == incremental
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+from app import cache, throttle
+from app.cache import LRUCache
+from app.routers.auth import normalize_email, unknown_email_cache
+from app.throttle import InflightLimiter, TokenBucketLimiter
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_token_bucket_denies_when_empty_and_refills(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttle, "time", SimpleNamespace(monotonic=clock))
+    limiter = TokenBucketLimiter(rate_per_minute=6, burst=2)
+
+    assert limiter.acquire("1.2.3.4") == (True, 0.0)
+    assert limiter.acquire("1.2.3.4") == (True, 0.0)
+    allowed, retry_after = limiter.acquire("1.2.3.4")
+    assert not allowed
+    assert retry_after == 10.0  # one token every 10s at 6/min
+    assert limiter.rejected == 1
+
+    # Other keys have their own bucket
+    assert limiter.acquire("5.6.7.8")[0]
+
+    clock.now += 10
+    assert limiter.acquire("1.2.3.4") == (True, 0.0)
+    assert not limiter.acquire("1.2.3.4")[0]
+
+    # Refill is capped at the burst size
+    clock.now += 3600
+    assert limiter.acquire("1.2.3.4")[0]
+    assert limiter.acquire("1.2.3.4")[0]
+    assert not limiter.acquire("1.2.3.4")[0]
+
+def test_token_bucket_evicts_idle_keys():
+    limiter = TokenBucketLimiter(rate_per_minute=6, burst=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+    assert len(limiter) == 2
+    # "a" was evicted, so it starts again from a full bucket
+    assert limiter.acquire("a")[0]
+
+def test_inflight_limiter_release_frees_a_slot():
+    limiter = InflightLimiter(2)
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    assert limiter.rejected == 1
+
+    limiter.release()
+    assert limiter.inflight == 1
+    assert limiter.try_acquire()
+    assert limiter.inflight == 2
+
+def test_negative_login_cache_expires(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, "time", SimpleNamespace(time=clock))
+    negative = LRUCache(maxsize=10, ttl=60)
+
+    negative.set(normalize_email(" Ghost@Example.com"), True)
+    clock.now += 59
+    assert negative.get("ghost@example.com") is True
+    clock.now += 1
+    assert negative.get("ghost@example.com") is None
+
+def test_unknown_email_cache_is_keyed_on_normalized_email(client):
+    response = client.post("/api/auth/login", data={"username": " Nobody@Example.com ", "password": "secret"})
+    assert response.status_code == 401
+    assert unknown_email_cache.get("nobody@example.com") is True
+    unknown_email_cache.pop("nobody@example.com")
+
+def test_wrong_case_login_does_not_poison_negative_cache(client, user):
+    response = client.post("/api/auth/login", data={"username": user.email.upper(), "password": "wrong"})
+    assert response.status_code == 401
+    # The account was found case-insensitively, so neither spelling is cached as unknown
+    assert unknown_email_cache.get(user.email) is None
+    assert unknown_email_cache.get(user.email.upper()) is None
@@ -39,7 +39,7 @@ export default function DashboardScreen({ navigation }) {
   useEffect(() => {
     fetchUserProfile();
     fetchFitnessProfile();
-    calculateStats();
+    fetchProgressStats();
   }, []);
 
   useEffect(() => {
@@ -51,12 +51,6 @@ export default function DashboardScreen({ navigation }) {
     }
   }, [activeTab, workoutPlan]);
 
-  useEffect(() => {
-    if (workoutHistory.length > 0) {
-      calculateStats();
-    }
-  }, [workoutHistory]);
-
   const fetchUserProfile = async () => {
     try {
       const response = await authAPI.getProfile();
@@ -81,8 +75,7 @@ export default function DashboardScreen({ navigation }) {
     setHistoryLoading(true);
     try {
       const response = await feedbackAPI.getMyWorkouts();
-      const workouts = response.data.workouts || [];
-      setWorkoutHistory(workouts);
+      setWorkoutHistory(response.data.workouts || []);
     } catch (error) {
       console.error('Error fetching workout history:', error);
       setWorkoutHistory([]);
@@ -91,29 +84,20 @@ export default function DashboardScreen({ navigation }) {
     }
   };
 
-  const calculateStats = () => {
-    const totalWorkouts = workoutHistory.length;
-    const caloriesBurned = workoutHistory.reduce((sum, workout) => sum + (workout.calories_burned || 0), 0);
-    const avgRating = workoutHistory.length > 0 
-      ? (workoutHistory.reduce((sum, workout) => sum + (workout.rating || 0), 0) / workoutHistory.length).toFixed(1)
-      : 0;
-    
-    // Calculate streak (simplified)
-    const today = new Date();
-    const yesterday = new Date(today);
-    yesterday.setDate(yesterday.getDate() - 1);
-    const streakDays = workoutHistory.filter(w => {
-      const workoutDate = new Date(w.created_at);
-      return workoutDate.toDateString() === today.toDateString() || 
-             workoutDate.toDateString() === yesterday.toDateString();
-    }).length;
-
-    setStats({
-      totalWorkouts,
-      caloriesBurned,
-      streakDays,
-      avgRating: parseFloat(avgRating)
-    });
+  const fetchProgressStats = async () => {
+    // Figures cover the whole history, from the server's rollup rather than one history page
+    try {
+      const response = await feedbackAPI.getProgressAnalytics();
+      const analytics = response.data || {};
+      setStats({
+        totalWorkouts: analytics.total_workouts || 0,
+        caloriesBurned: 0, // not tracked by the API yet
+        streakDays: analytics.current_streak || 0,
+        avgRating: analytics.average_rating || 0
+      });
+    } catch (error) {
+      console.error('Error fetching progress stats:', error);
+    }
   };
 
   const initializeWorkoutLogData = () => {
@@ -193,6 +177,7 @@ export default function DashboardScreen({ navigation }) {
       };
 
       const response = await feedbackAPI.logWorkout(workoutData);
+      fetchProgressStats();
       
       Alert.alert(
         '✅ Workout Logged Successfully!', 
@@ -947,7 +932,7 @@ export default function DashboardScreen({ navigation }) {
                         </View>
                         <View style={styles.historyWorkoutInfo}>
                           <Text style={styles.historyWorkoutPlan}>
-                            {workout.workout_plan?.plan_name || 'Workout Session'}
+                            {workout.workout_name || workout.workout_plan?.plan_name || 'Workout Session'}
                           </Text>
                           <Text style={styles.historyWorkoutDate}>
                             {formatDate(workout.created_at)} • {workout.duration_minutes || 30} min
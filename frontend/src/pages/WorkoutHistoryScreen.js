@@ -13,6 +13,9 @@ export default function WorkoutHistoryScreen({ navigation }) {
   const [refreshing, setRefreshing] = useState(false);
   const [error, setError] = useState(null);
   const [progressAnalytics, setProgressAnalytics] = useState(null);
+  const [totalWorkouts, setTotalWorkouts] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchWorkoutHistory();
@@ -28,6 +31,8 @@ export default function WorkoutHistoryScreen({ navigation }) {
       
       if (response.data && response.data.workouts) {
         setWorkoutHistory(response.data.workouts);
+        setTotalWorkouts(response.data.total_workouts || 0);
+        setNextCursor(response.data.next_cursor || null);
       } else {
         setWorkoutHistory(response.data || []);
       }
@@ -41,6 +46,20 @@ export default function WorkoutHistoryScreen({ navigation }) {
     }
   };
 
+  const loadMoreWorkouts = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await feedbackAPI.getMyWorkouts({ cursor: nextCursor });
+      setWorkoutHistory(prev => [...prev, ...(response.data.workouts || [])]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error loading more workouts:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchProgressAnalytics = async () => {
     try {
       const response = await feedbackAPI.getProgressAnalytics();
@@ -210,7 +229,7 @@ export default function WorkoutHistoryScreen({ navigation }) {
               <View style={styles.metaItem}>
                 <Ionicons name="barbell" size={10} color="#666" />
                 <Text style={styles.metaText}>
-                  {workout.exercises_logged?.length || workout.workout_plan?.exercises?.length || 0} exercises
+                  {workout.exercise_count ?? workout.exercises_logged?.length ?? workout.workout_plan?.exercises?.length ?? 0} exercises
                 </Text>
               </View>
             </View>
@@ -284,7 +303,7 @@ export default function WorkoutHistoryScreen({ navigation }) {
         <View style={styles.historySection}>
           <View style={styles.sectionHeader}>
             <Text style={styles.sectionTitle}>
-              Recent Workouts ({workoutHistory.length})
+              Recent Workouts ({totalWorkouts || workoutHistory.length})
             </Text>
             <TouchableOpacity 
               style={styles.generateButton}
@@ -333,6 +352,19 @@ export default function WorkoutHistoryScreen({ navigation }) {
           ) : (
             <View style={styles.historyList}>
               {workoutHistory.map(renderWorkoutCard)}
+              {nextCursor && (
+                <TouchableOpacity
+                  style={styles.loadMoreButton}
+                  onPress={loadMoreWorkouts}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? (
+                    <ActivityIndicator size="small" color="white" />
+                  ) : (
+                    <Text style={styles.retryButtonText}>Load More</Text>
+                  )}
+                </TouchableOpacity>
+              )}
             </View>
           )}
         </View>
@@ -494,6 +526,13 @@ const styles = StyleSheet.create({
     paddingVertical: 8,
     borderRadius: 8,
   },
+  loadMoreButton: {
+    backgroundColor: '#667eea',
+    paddingVertical: 10,
+    borderRadius: 8,
+    alignItems: 'center',
+    marginTop: 8,
+  },
   retryButtonText: {
     color: 'white',
     fontSize: 12,
@@ -28,7 +28,24 @@ api.interceptors.request.use(
 // Add response interceptor to handle errors
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const originalRequest = error.config;
+
+    // Access token expired: trade the refresh token for a new one and retry once
+    if (
+      error.response?.status === 401 &&
+      originalRequest &&
+      !originalRequest._retry &&
+      !originalRequest.url?.includes('api/auth/')
+    ) {
+      originalRequest._retry = true;
+      const newToken = await tokenService.refresh();
+      if (newToken) {
+        originalRequest.headers.Authorization = `Bearer ${newToken}`;
+        return api(originalRequest);
+      }
+    }
+
     if (error.response?.status === 401) {
       // Token expired or invalid
       AsyncStorage.removeItem('userToken');
@@ -38,6 +55,9 @@ api.interceptors.response.use(
   }
 );
 
+// Single in-flight refresh, so parallel 401s don't replay a rotated token
+let refreshInFlight = null;
+
 // Token management functions
 export const tokenService = {
   setToken: async (token) => {
@@ -52,8 +72,38 @@ export const tokenService = {
 
   removeToken: async () => {
     await AsyncStorage.removeItem('userToken');
+    await AsyncStorage.removeItem('refreshToken');
     delete api.defaults.headers.common['Authorization'];
   },
+
+  setRefreshToken: async (refreshToken) => {
+    await AsyncStorage.setItem('refreshToken', refreshToken);
+  },
+
+  refresh: () => {
+    if (!refreshInFlight) {
+      refreshInFlight = (async () => {
+        const refreshToken = await AsyncStorage.getItem('refreshToken');
+        if (!refreshToken) {
+          return null;
+        }
+        try {
+          const response = await axios.post(`${API_BASE_URL}/api/auth/refresh`, {
+            refresh_token: refreshToken,
+          });
+          await tokenService.setToken(response.data.access_token);
+          await tokenService.setRefreshToken(response.data.refresh_token);
+          return response.data.access_token;
+        } catch (error) {
+          await AsyncStorage.removeItem('refreshToken');
+          return null;
+        } finally {
+          refreshInFlight = null;
+        }
+      })();
+    }
+    return refreshInFlight;
+  },
 };
 
 // Auth API calls
@@ -75,6 +125,9 @@ export const authAPI = {
     if (response.data.access_token) {
       await tokenService.setToken(response.data.access_token);
     }
+    if (response.data.refresh_token) {
+      await tokenService.setRefreshToken(response.data.refresh_token);
+    }
     
     return response;
   },
@@ -82,6 +135,11 @@ export const authAPI = {
   getProfile: () => api.get('api/auth/me'), // Token is auto-added by interceptor
   
   logout: async () => {
+    const refreshToken = await AsyncStorage.getItem('refreshToken');
+    if (refreshToken) {
+      // Best effort: revoke server-side, but always clear local tokens
+      await api.post('api/auth/logout', { refresh_token: refreshToken }).catch(() => {});
+    }
     await tokenService.removeToken();
   },
 };
@@ -92,10 +150,13 @@ export const workoutsAPI = {
   generateWorkout: () => api.post('/api/generate-workout'),
   
   // Basic workout (fallback)
-  generateBasicWorkout: () => api.post('/api/generate-basic'),
+  generateBasicWorkout: () => api.get('/api/generate-basic'),
   
   // Get available workout plans
   getWorkoutPlans: () => api.get('/api/plans'),
+  
+  // Page through a periodized multi-week program ({ weeks, start, limit })
+  getWorkoutProgram: (params = {}) => api.get('/api/workout-program', { params }),
 };
 
 // User API calls
@@ -112,12 +173,15 @@ export const feedbackAPI = {
   // Legacy endpoint (maintained)
   submitWorkoutFeedback: (feedbackData) => api.post('/api/workout-feedback', feedbackData),
   
-  // Get enhanced workout history
-  getMyWorkouts: () => api.get('/api/my-workouts'),
+  // Get enhanced workout history, one page at a time ({ limit, cursor, fields })
+  getMyWorkouts: (params = {}) => api.get('/api/my-workouts', { params }),
   
   // Get progress analytics
   getProgressAnalytics: () => api.get('/api/progress-analytics'),
   
+  // Get streaks, moving averages and 4/12-week trends
+  getProgressTrends: () => api.get('/api/progress-trends'),
+  
   // Get detailed workout info
   getWorkoutDetails: (workoutId) => api.get(`/api/workout-details/${workoutId}`),
 